@@ -14,4 +14,41 @@ TAX_KEYWORDS = [
 ]
 DATABASE_NAME = "tax_opportunities.db"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
-HEADERS = {'User-Agent': USER_AGENT}
\ No newline at end of file
+HEADERS = {'User-Agent': USER_AGENT}
+DB_BUSY_TIMEOUT = 30.0 # Seconds a connection waits on a locked database before giving up
+DB_MAX_READERS = 8 # Read-only connections pooled per process; reads beyond that wait for a free one
+EXPORT_DIR_NAME = "exports" # Parquet snapshots, stored under data/
+EXPORT_CHUNK_SIZE = 50000 # Rows read from the database per export chunk
+GAZETTE_CACHE_DIR_NAME = "gazette_cache" # Downloaded Gazette (ΦΕΚ) issue PDFs, stored under data/
+GAZETTE_MAX_ISSUES = 5 # Latest issues processed per pipeline run
+GAZETTE_MAX_DECISION_CHARS = 20000 # Text kept per Gazette decision
+SCRAPER_ARCHIVE_MODE = None # None: live scraping, "capture": also archive every fetched page, "replay": read pages from the archive only
+SCRAPER_ARCHIVE_DIR_NAME = "page_archive" # Captured pages, stored under data/
+SCRAPER_REPLAY_AT = None # ISO timestamp: replay the latest capture made at or before it (None: latest capture)
+SCHEDULER_ENABLED = True # Poll each source only when it is due; False polls every source on every run
+SCHEDULER_STATE_FILE_NAME = "source_schedule.json" # Per-source health and schedule, stored under data/
+SCHEDULER_MIN_INTERVAL = 10 * 60 # Seconds between polls of a source that usually has new items
+SCHEDULER_MAX_INTERVAL = 6 * 60 * 60 # Seconds between polls of a quiet source
+SCHEDULER_EWMA_ALPHA = 0.3 # Weight of the latest poll in the per-source averages
+SCHEDULER_FAILURE_THRESHOLD = 3 # Consecutive failures that open a source's circuit
+SCHEDULER_BASE_BACKOFF = 15 * 60 # Seconds a source is skipped when its circuit first opens (doubles per failure)
+SCHEDULER_MAX_BACKOFF = 24 * 60 * 60
+SCHEDULER_MIN_TIMEOUT = 5 # Request timeout bounds in seconds; in between it follows the observed latency
+SCHEDULER_MAX_TIMEOUT = 15
+SCHEDULER_TIMEOUT_FACTOR = 4 # Timeout = latency average x this factor
+SIMILARITY_INDEX_FILE_NAME = "similarity_index.npz" # Hashed TF-IDF vectors and neighbour lists, stored under data/
+SIMILARITY_HASH_FEATURES = 2 ** 18 # Hashed term columns of the similarity vectors
+SIMILARITY_TOP_K = 5 # Related opportunities kept per opportunity
+SIMILARITY_MIN_SCORE = 0.1 # Cosine similarity below which opportunities are not considered related
+WEBHOOK_URL = None # Local endpoint that receives new opportunity changes after each pipeline run (None: disabled)
+WEBHOOK_MIN_SCORE = 10 # Only changes of opportunities scoring at least this much are sent
+WEBHOOK_BATCH_SIZE = 100 # Changes per POST
+WEBHOOK_MAX_RETRIES = 3 # Retries of a failed POST, with exponential backoff
+WEBHOOK_STATE_FILE_NAME = "webhook_cursor.json" # Position of the dispatcher in the change log, stored under data/
+WEBHOOK_DEAD_LETTER_FILE_NAME = "webhook_dead_letters.jsonl" # Batches the webhook rejected (4xx) and that were skipped, stored under data/
+ARCHIVE_AFTER_DAYS = 180 # Opportunities older than this move to the archive database (<database>_archive.db under data/)
+ARCHIVE_BATCH_SIZE = 1000 # Rows moved per archival transaction
+DASHBOARD_READ_ONLY = False # Hides the refresh and rescore actions: the dashboard only reads the database (e.g. on autoscaled replicas, also from a read-only mount) and never creates or migrates it, so a writing instance must have run first
+STARTUP_IMPORT_TARGET = 1.5 # Seconds allowed for the dashboard's start-up imports (utils/startup_benchmark.py)
+STARTUP_FIRST_RENDER_TARGET = 3.0 # Seconds allowed from process start to the first rendered page (utils/startup_benchmark.py)
+SIMILARITY_IDF_REBUILD_GROWTH = 1.2 # The index is rebuilt (IDF refreshed) once it holds this many times the rows its IDF was computed from
\ No newline at end of file
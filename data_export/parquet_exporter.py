@@ -0,0 +1,214 @@
+# data_export/parquet_exporter.py
+
+import os
+import sys
+import json
+import shutil
+from datetime import datetime
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add the project root to the PATH to locate the config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+
+DEFAULT_EXPORT_DIR = os.path.join(project_root, 'data', config.EXPORT_DIR_NAME)
+STATE_FILE_NAME = '_snapshots.json'    # Leading underscore: ignored by the Parquet dataset readers
+ARROW_CACHE_FILE_NAME = '_latest.arrow'
+
+# 'month' and 'source' are not stored in the files: they are the Hive partition keys
+# (month=YYYY-MM/source=...), restored by the loaders.
+DICTIONARY_COLUMNS = ['main_topic', 'opportunity_type', 'rules_version']
+EXPORT_SCHEMA = pa.schema([
+    ('export_seq', pa.int64()),
+    ('id', pa.string()),
+    ('title', pa.string()),
+    ('url', pa.string()),
+    ('date', pa.date32()),
+    ('full_text', pa.string()),
+    ('keywords', pa.string()),
+    ('entities', pa.string()),
+    ('main_topic', pa.dictionary(pa.int32(), pa.string())),
+    ('sentiment', pa.float64()),
+    ('opportunity_score', pa.float64()),
+    ('opportunity_type', pa.dictionary(pa.int32(), pa.string())),
+    ('rules_version', pa.dictionary(pa.int32(), pa.string())),
+    ('added_date', pa.string()),
+])
+
+class ParquetExporter:
+    """
+    Exports the opportunities table as a partitioned Parquet dataset (by month and source).
+    Rows are streamed from the database in chunks, so memory use does not grow with the table.
+    Each export is a numbered snapshot; incremental exports only write the rows changed since
+    the previous snapshot. Progress is tracked with the change-log seq, which (unlike the rowid)
+    is never reused, and archived opportunities are exported too.
+    """
+
+    def __init__(self, db_manager, export_dir=DEFAULT_EXPORT_DIR, chunk_size=config.EXPORT_CHUNK_SIZE):
+        self.db_manager = db_manager
+        self.export_dir = export_dir
+        self.chunk_size = chunk_size
+        self.state_path = os.path.join(export_dir, STATE_FILE_NAME)
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'last_export_seq': None, 'snapshots': []}
+
+    def _save_state(self, state):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _partition_dir(self, month, source):
+        # Partition values are URI-encoded, which is how the Hive partitioning reader decodes them
+        return os.path.join(self.export_dir, f"month={quote(month, safe='')}", f"source={quote(source, safe='')}")
+
+    def _to_arrow(self, chunk):
+        """Converts a DataFrame chunk to an Arrow table with the export schema."""
+        arrays = []
+        for field in EXPORT_SCHEMA:
+            values = chunk[field.name] if field.name in chunk.columns else pd.Series([None] * len(chunk), index=chunk.index)
+            if field.name == 'date':
+                timestamps = pa.array(pd.to_datetime(values, errors='coerce'), from_pandas=True)
+                arrays.append(timestamps.cast(pa.date32()))
+            elif field.name in ('opportunity_score', 'sentiment'):
+                arrays.append(pa.array(pd.to_numeric(values, errors='coerce'), type=pa.float64(), from_pandas=True))
+            elif field.name == 'export_seq':
+                arrays.append(pa.array(values, type=pa.int64()))
+            else:
+                strings = pa.array(values.astype(object).where(values.notna(), None).map(lambda v: v if v is None else str(v)),
+                                   type=pa.string())
+                arrays.append(strings.dictionary_encode() if field.name in DICTIONARY_COLUMNS else strings)
+        return pa.Table.from_arrays(arrays, schema=EXPORT_SCHEMA)
+
+    def export(self, incremental=True):
+        """
+        Writes a new snapshot and returns a summary dict.
+        With incremental=False (or no watermark from a previous export) the existing dataset is
+        discarded and everything, archive included, is re-exported.
+        """
+        os.makedirs(self.export_dir, exist_ok=True)
+        state = self._load_state()
+        if state.get('last_export_seq') is None or state.get('schema') != EXPORT_SCHEMA.to_string():
+            incremental = False # First export, or a dataset written with an older watermark or schema
+        if not incremental:
+            for name in os.listdir(self.export_dir):
+                path = os.path.join(self.export_dir, name)
+                if name.startswith('month=') and os.path.isdir(path):
+                    shutil.rmtree(path)
+            if os.path.exists(self.state_path):
+                os.remove(self.state_path)
+            state = self._load_state()
+
+        snapshot_id = len(state['snapshots']) + 1
+        # Files are written under a hidden name (ignored by readers) and renamed once the snapshot is complete
+        file_name = f"part-{snapshot_id:05d}.parquet"
+        writers = {}
+        rows_written = 0
+        # Read before the rows: a change committed during the export is past the watermark and exported next time
+        last_export_seq = self.db_manager.last_change_seq()
+
+        try:
+            chunks = self.db_manager.iter_opportunity_chunks(
+                changed_after=state['last_export_seq'], up_to_seq=last_export_seq,
+                chunk_size=self.chunk_size, include_archive=True
+            )
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                months = pd.to_datetime(chunk['date'], errors='coerce').dt.strftime('%Y-%m').fillna('unknown')
+                sources = chunk['source'].fillna('unknown').astype(str)
+                for (month, source), positions in chunk.groupby([months, sources], sort=False).indices.items():
+                    partition_dir = self._partition_dir(month, source)
+                    if partition_dir not in writers:
+                        os.makedirs(partition_dir, exist_ok=True)
+                        writers[partition_dir] = pq.ParquetWriter(
+                            os.path.join(partition_dir, '.' + file_name), EXPORT_SCHEMA,
+                            use_dictionary=DICTIONARY_COLUMNS, compression='zstd'
+                        )
+                    writers[partition_dir].write_table(self._to_arrow(chunk.iloc[positions]))
+                rows_written += len(chunk)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        for partition_dir in writers:
+            os.replace(os.path.join(partition_dir, '.' + file_name), os.path.join(partition_dir, file_name))
+
+        if rows_written == 0:
+            print("No new opportunities since the last snapshot; nothing exported.")
+            return {'snapshot_id': None, 'rows': 0, 'partitions': 0}
+
+        state['last_export_seq'] = last_export_seq
+        state['schema'] = EXPORT_SCHEMA.to_string()
+        state['snapshots'].append({
+            'snapshot_id': snapshot_id,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'rows': rows_written,
+            'partitions': len(writers),
+            'max_export_seq': last_export_seq,
+        })
+        self._save_state(state)
+        print(f"Snapshot {snapshot_id}: exported {rows_written} opportunities into {len(writers)} partitions.")
+        return state['snapshots'][-1]
+
+def _latest_rows_only(table):
+    """Keeps only the most recent export of every id (changed rows are exported again with a higher export_seq)."""
+    keys = pd.DataFrame({'id': table['id'].to_pandas(), 'export_seq': table['export_seq'].to_pandas()})
+    latest = keys.sort_values('export_seq', kind='stable').drop_duplicates('id', keep='last').index
+    return table.take(pa.array(sorted(latest), type=pa.int64()))
+
+def load_snapshot(export_dir=DEFAULT_EXPORT_DIR, columns=None, filters=None, latest_only=True):
+    """
+    Loads the exported dataset as an Arrow table, memory-mapping the Parquet files.
+    filters use the pyarrow syntax, e.g. [('month', '>=', '2024-01'), ('source', '=', 'AADE')],
+    and prune whole partitions without reading them. Call .to_pandas() for a DataFrame.
+    """
+    if columns is not None and latest_only:
+        columns = list(dict.fromkeys(list(columns) + ['id', 'export_seq']))
+    table = pq.read_table(export_dir, columns=columns, filters=filters, memory_map=True, partitioning='hive')
+    return _latest_rows_only(table) if latest_only else table
+
+def build_arrow_cache(export_dir=DEFAULT_EXPORT_DIR):
+    """
+    Writes the latest version of every row to an uncompressed Arrow IPC file next to the
+    dataset. Unlike Parquet, that file can be memory-mapped without decoding (see load_arrow_cache).
+    """
+    table = load_snapshot(export_dir)
+    cache_path = os.path.join(export_dir, ARROW_CACHE_FILE_NAME)
+    tmp_path = cache_path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+def load_arrow_cache(export_dir=DEFAULT_EXPORT_DIR):
+    """
+    Zero-copy load of the Arrow cache: the returned table points into the memory-mapped file,
+    so it loads in roughly constant time whatever the export size.
+    The cache is rebuilt first if a newer snapshot exists.
+    """
+    cache_path = os.path.join(export_dir, ARROW_CACHE_FILE_NAME)
+    state_path = os.path.join(export_dir, STATE_FILE_NAME)
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(state_path):
+        build_arrow_cache(export_dir)
+    source = pa.memory_map(cache_path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+if __name__ == "__main__":
+    from database.db_manager import DBManager
+
+    exporter = ParquetExporter(DBManager())
+    summary = exporter.export(incremental='--full' not in sys.argv)
+    print(summary)
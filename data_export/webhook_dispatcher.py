@@ -0,0 +1,122 @@
+# data_export/webhook_dispatcher.py
+
+import os
+import sys
+import json
+import time
+
+import requests
+
+# Add the project root to the PATH to locate the config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+
+DEFAULT_STATE_PATH = os.path.join(project_root, 'data', config.WEBHOOK_STATE_FILE_NAME)
+DEFAULT_DEAD_LETTER_PATH = os.path.join(project_root, 'data', config.WEBHOOK_DEAD_LETTER_FILE_NAME)
+
+# Outcomes of posting one batch
+ACCEPTED, REJECTED, FAILED = 'accepted', 'rejected', 'failed'
+
+class WebhookDispatcher:
+    """
+    Posts new entries of the opportunities change log to a webhook, in batches.
+    The position in the log is kept in a small JSON file and only advanced after the
+    receiver accepted a batch, so delivery is at-least-once: a failed batch is retried
+    (with exponential backoff) and, if it still fails, sent again on the next dispatch.
+    A batch the receiver rejects (4xx) would be rejected again, so it is appended to a
+    dead-letter JSON Lines file instead and the cursor moves past it.
+    Each POST body is {"changes": [...], "cursor": <seq of the last change in the batch>}.
+    """
+
+    def __init__(self, db_manager, url=None, min_score=None, batch_size=None, max_retries=None,
+                 state_path=DEFAULT_STATE_PATH, dead_letter_path=DEFAULT_DEAD_LETTER_PATH, timeout=15):
+        self.db_manager = db_manager
+        self.url = url or config.WEBHOOK_URL
+        self.min_score = min_score if min_score is not None else config.WEBHOOK_MIN_SCORE
+        self.batch_size = batch_size or config.WEBHOOK_BATCH_SIZE
+        self.max_retries = max_retries if max_retries is not None else config.WEBHOOK_MAX_RETRIES
+        self.state_path = state_path
+        self.dead_letter_path = dead_letter_path
+        self.timeout = timeout
+
+    def load_cursor(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('cursor', 0)
+        return 0
+
+    def save_cursor(self, cursor):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'cursor': cursor}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def dead_letter(self, payload, reason):
+        """Appends a rejected batch, with the reason, to the dead-letter file."""
+        os.makedirs(os.path.dirname(self.dead_letter_path), exist_ok=True)
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'reason': reason, **payload}, ensure_ascii=False, default=str) + '\n')
+
+    def _post(self, payload):
+        """
+        POSTs one batch, retrying with exponential backoff.
+        Returns (ACCEPTED, None), (REJECTED, reason) for a 4xx reply, or (FAILED, None).
+        """
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(2 ** (attempt - 1))
+            try:
+                response = requests.post(self.url, data=body, timeout=self.timeout,
+                                         headers={'Content-Type': 'application/json; charset=utf-8'})
+                if response.status_code < 500:
+                    response.raise_for_status() # 4xx: the batch itself is rejected, retrying will not help
+                    return ACCEPTED, None
+                print(f"Webhook returned {response.status_code} (attempt {attempt + 1} of {self.max_retries + 1}).")
+            except requests.exceptions.HTTPError as e:
+                return REJECTED, str(e)
+            except requests.exceptions.RequestException as e:
+                print(f"Error posting to the webhook (attempt {attempt + 1} of {self.max_retries + 1}): {e}")
+        return FAILED, None
+
+    def dispatch(self):
+        """Sends every change since the stored cursor. Returns the number of changes delivered."""
+        if not self.url:
+            print("No webhook URL configured; nothing dispatched.")
+            return 0
+
+        cursor = self.load_cursor()
+        delivered = 0
+        while True:
+            changes, next_cursor = self.db_manager.changes_since(cursor, min_score=self.min_score, limit=self.batch_size)
+            if not changes.empty:
+                records = changes.astype(object).where(changes.notna(), None).to_dict('records')
+                payload = {'changes': records, 'cursor': next_cursor}
+                outcome, reason = self._post(payload)
+                if outcome == FAILED:
+                    print(f"Webhook delivery stopped at cursor {cursor}; it will resume from there.")
+                    break
+                if outcome == REJECTED:
+                    self.dead_letter(payload, reason)
+                    print(f"Webhook rejected the changes after cursor {cursor} ({reason}); "
+                          f"skipped them and wrote them to {self.dead_letter_path}.")
+                else:
+                    delivered += len(records)
+            if next_cursor != cursor:
+                self.save_cursor(next_cursor)
+            if len(changes) < self.batch_size:
+                break
+            cursor = next_cursor
+
+        if delivered:
+            print(f"Delivered {delivered} opportunity changes to the webhook.")
+        return delivered
+
+if __name__ == "__main__":
+    from database.db_manager import DBManager
+
+    WebhookDispatcher(DBManager()).dispatch()
@@ -0,0 +1,241 @@
+import requests
+from bs4 import BeautifulSoup
+import pandas as pd
+import os
+import sys
+import re
+import mmap
+import hashlib
+from datetime import datetime
+from pypdf import PdfReader
+
+# Add the project root to the PATH to locate config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+from data_ingestion.legislative_scraper import GREEK_MONTH_MAP, poll_source, scheduler_in_use
+from data_ingestion.source_scheduler import get_source_scheduler
+
+DEFAULT_CACHE_DIR = os.path.join(project_root, 'data', config.GAZETTE_CACHE_DIR_NAME)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# A decision starts with its protocol number ("Αριθμ. Α.1054") or its sequence number in the issue ("(1)")
+DECISION_MARKER = re.compile(r'^\s*(?:Αριθμ\.|Αριθ\.|Αρ\.\s*Πρωτ\.|\(\d{1,3}\)\s*$)')
+# Running page headers/footers repeated on every page of an issue
+PAGE_BOILERPLATE = re.compile(r'^\s*(?:ΕΦΗΜΕΡΙ[ΣΔ]\s+ΤΗΣ\s+ΚΥΒΕΡΝΗΣΕΩΣ|Τεύχος\s+\S+\s+\d+/[\d.]+|\*\d{14}\*|\d{1,4})\s*$')
+ISSUE_DATE_NUMERIC = re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})')
+ISSUE_DATE_TEXT = re.compile(r'(\d{1,2})\s+([Α-Ωα-ωΆ-Ώά-ώϊΐ]+)\s+(\d{4})')
+
+def cached_pdf_path(pdf_url, cache_dir=DEFAULT_CACHE_DIR):
+    """Path of an issue PDF in the local cache (whether or not it has been downloaded)."""
+    return os.path.join(cache_dir, hashlib.sha1(pdf_url.encode('utf-8')).hexdigest() + '.pdf')
+
+def download_issue_pdf(pdf_url, cache_dir=DEFAULT_CACHE_DIR, headers=None, current_config=None):
+    """
+    Downloads a Gazette issue PDF into the local cache (streamed to disk in chunks)
+    and returns the cached file path. Already cached issues are not downloaded again.
+    """
+    cfg = current_config if current_config else config
+    os.makedirs(cache_dir, exist_ok=True)
+    pdf_path = cached_pdf_path(pdf_url, cache_dir)
+    if os.path.exists(pdf_path):
+        return pdf_path
+    if cfg.SCRAPER_ARCHIVE_MODE == "replay":
+        print(f"Gazette issue {pdf_url} is not in the local cache; skipped in replay mode.")
+        return None
+
+    print(f"Downloading Gazette issue: {pdf_url}")
+    tmp_path = pdf_path + '.part'
+    try:
+        with requests.get(pdf_url, headers=headers or cfg.HEADERS, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            with open(tmp_path, 'wb') as f:
+                for block in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(block)
+        os.replace(tmp_path, pdf_path)
+        return pdf_path
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading Gazette issue {pdf_url}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+
+def iter_pdf_pages(pdf_path):
+    """
+    Yields the text of a PDF one page at a time.
+    The file is memory-mapped rather than read into memory, and only the
+    current page's text is held, so long issues keep memory use bounded.
+    """
+    with open(pdf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            reader = PdfReader(mapped)
+            for page in reader.pages:
+                yield page.extract_text() or ""
+            del reader
+
+def parse_issue_date(text):
+    """Extracts the issue date from the first page text (e.g. '15.03.2024' or '15 Μαρτίου 2024')."""
+    match = ISSUE_DATE_NUMERIC.search(text)
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        try:
+            return datetime(year, month, day).date()
+        except ValueError:
+            pass
+    for match in ISSUE_DATE_TEXT.finditer(text):
+        day, month_name, year = match.groups()
+        english_month = GREEK_MONTH_MAP.get(month_name)
+        if english_month:
+            try:
+                return datetime.strptime(f"{day} {english_month} {year}", '%d %B %Y').date()
+            except ValueError:
+                continue
+    return None
+
+def split_decisions(page_texts, max_chars=None):
+    """
+    Splits a stream of page texts into the individual decisions of a Gazette issue.
+    Yields dicts with 'number' (1-based position in the issue), 'title' and 'text'.
+    Consumes the pages lazily; at most max_chars of each decision's text are kept.
+    """
+    max_chars = max_chars or config.GAZETTE_MAX_DECISION_CHARS
+    number = 0
+    title_lines, title_done = [], False
+    body_parts, body_length = [], 0
+    in_markers = False
+
+    def finish():
+        return {'number': number, 'title': " ".join(title_lines)[:300], 'text': "\n".join(body_parts)}
+
+    for page_text in page_texts:
+        for line in page_text.splitlines():
+            line = line.strip()
+            if not line or PAGE_BOILERPLATE.match(line):
+                continue
+            if DECISION_MARKER.match(line):
+                # Consecutive markers ("(1)" followed by "Αριθμ. ...") belong to the same decision
+                if not in_markers:
+                    if number and title_lines:
+                        yield finish()
+                    number += 1
+                    title_lines, title_done = [], False
+                    body_parts, body_length = [], 0
+                    in_markers = True
+                continue
+            in_markers = False
+            if not number:
+                continue # Issue front matter before the first decision
+
+            # The title runs until a full stop or the issuing authority heading (an all-caps line)
+            if not title_done:
+                if line.isupper() and title_lines:
+                    title_done = True
+                else:
+                    title_lines.append(line)
+                    title_done = line.endswith('.') or sum(len(part) for part in title_lines) >= 300
+
+            if body_length < max_chars:
+                body_parts.append(line[:max_chars - body_length])
+                body_length += len(body_parts[-1]) + 1
+
+    if number and title_lines:
+        yield finish()
+
+def parse_gazette_issue(pdf_path, pdf_url, current_config=None):
+    """Turns one cached Gazette issue into news-like rows (one per decision)."""
+    cfg = current_config if current_config else config
+    pages = iter_pdf_pages(pdf_path)
+    first_page = next(pages, "")
+    issue_date = parse_issue_date(first_page)
+
+    def all_pages():
+        yield first_page
+        yield from pages
+
+    rows = []
+    for decision in split_decisions(all_pages(), max_chars=cfg.GAZETTE_MAX_DECISION_CHARS):
+        rows.append({
+            'title': decision['title'],
+            'url': f"{pdf_url}#decision-{decision['number']}",
+            'date': issue_date,
+            'source': 'ΦΕΚ',
+            'description': decision['text'][:1000], # NLP runs on the title and the opening of the decision
+            'full_text': decision['text'],
+        })
+    return rows
+
+def parse_gazette_search_results(html_content, current_config=None):
+    """Returns the issue PDF links found on a Gazette search results page."""
+    if not html_content:
+        return []
+    cfg = current_config if current_config else config
+    soup = BeautifulSoup(html_content, 'lxml')
+    pdf_urls = []
+    for link_tag in soup.find_all('a', href=True):
+        href = link_tag['href']
+        if href.lower().split('?')[0].endswith('.pdf'):
+            pdf_url = requests.compat.urljoin(cfg.GOV_GAZETTE_BASE_URL, href)
+            if pdf_url not in pdf_urls:
+                pdf_urls.append(pdf_url)
+    if not pdf_urls:
+        print("Note: No issue PDF links found on the Gazette search page.")
+    return pdf_urls
+
+def get_latest_gazette_items(current_config=None, issue_urls=None, cache_dir=DEFAULT_CACHE_DIR, force=False):
+    """
+    Collects the decisions of the latest Government Gazette (ΦΕΚ) issues.
+    issue_urls can be given explicitly (URLs or local PDF paths); otherwise they are taken
+    from the Gazette search page, which is polled through the source scheduler like the
+    news sites (force=True polls it even if it is not due). Of the GAZETTE_MAX_ISSUES latest issues
+    listed there, only the new ones are parsed, plus any a previous run could not download:
+    the others were ingested before. Returns a DataFrame in the same shape as
+    get_latest_legislative_news, ready for the NLP and scoring steps.
+    """
+    cfg = current_config if current_config else config
+
+    if issue_urls is None:
+        def latest_issues(html_content, current_config=None):
+            return parse_gazette_search_results(html_content, current_config=current_config)[:cfg.GAZETTE_MAX_ISSUES]
+
+        issue_urls = poll_source('ΦΕΚ', cfg.GOV_GAZETTE_SEARCH_URL, latest_issues, current_config=cfg, force=force,
+                                 item_id=lambda pdf_url: pdf_url, new_only=True,
+                                 pending=lambda pdf_url: not os.path.exists(cached_pdf_path(pdf_url, cache_dir)))
+        if scheduler_in_use(cfg):
+            get_source_scheduler(cfg).save()
+        issue_urls = issue_urls or []
+
+    all_items = []
+    for issue_url in issue_urls:
+        if os.path.exists(issue_url):
+            pdf_path = issue_url
+        else:
+            pdf_path = download_issue_pdf(issue_url, cache_dir=cache_dir, current_config=cfg)
+        if not pdf_path:
+            continue
+        try:
+            issue_items = parse_gazette_issue(pdf_path, issue_url, current_config=cfg)
+        except Exception as e:
+            print(f"Error extracting text from Gazette issue {issue_url}: {e}")
+            continue
+        print(f"Found {len(issue_items)} decisions in Gazette issue {issue_url}.")
+        all_items.extend(issue_items)
+
+    if not all_items:
+        print("No decisions found in the Government Gazette.")
+        return pd.DataFrame()
+
+    df = pd.DataFrame(all_items)
+    df['id'] = df['url']
+    df = df.dropna(subset=['date'])
+    if df.empty:
+        print("No Gazette decisions with a valid issue date.")
+        return pd.DataFrame()
+    df = df.sort_values(by='date', ascending=False).reset_index(drop=True)
+    print(f"Total {len(df)} decisions found in the Government Gazette.")
+    return df
+
+if __name__ == "__main__":
+    print("This script is meant to be imported and called from the main application.")
+    print("Pass local PDF paths to get_latest_gazette_items(issue_urls=[...]) to parse cached issues.")
@@ -4,7 +4,7 @@ import pandas as pd
 import os
 import sys
 import re
-import importlib
+import time
 from datetime import datetime, date
 
 # Add the project root to the PATH to locate config module
@@ -13,17 +13,43 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 import config # Import config here
-importlib.reload(config) # Reload config to ensure latest version
+from data_ingestion.page_archive import get_page_archive
+from data_ingestion.source_scheduler import get_source_scheduler
 
-def fetch_page_content(url, headers=None, current_config=None):
+# Greek month names (genitive and abbreviated) -> English, for strptime
+GREEK_MONTH_MAP = {
+    'Ιανουαρίου': 'January', 'Φεβρουαρίου': 'February', 'Μαρτίου': 'March',
+    'Απριλίου': 'April', 'Μαΐου': 'May', 'Ιουνίου': 'June',
+    'Ιουλίου': 'July', 'Αυγούστου': 'August', 'Σεπτεμβρίου': 'September',
+    'Οκτωβρίου': 'October', 'Νοεμβρίου': 'November', 'Δεκεμβρίου': 'December',
+    'Ιαν': 'Jan', 'Φεβ': 'Feb', 'Μαρ': 'Mar', 'Απρ': 'Apr', 'Μαϊ': 'May',
+    'Ιουν': 'Jun', 'Ιουλ': 'Jul', 'Αυγ': 'Aug', 'Σεπ': 'Sep', 'Οκτ': 'Oct',
+    'Νοε': 'Nov', 'Δεκ': 'Dec'
+}
+
+def fetch_page_content(url, headers=None, current_config=None, timeout=15):
     """
-    Retrieves the HTML content of a webpage.
+    Retrieves the HTML content of a webpage (timeout in seconds).
+    With SCRAPER_ARCHIVE_MODE = "capture" every response is also written to the page archive;
+    with "replay" the page is read from the archive and the network is not used at all.
     """
+    cfg = current_config if current_config else config
     if headers is None:
-        headers = current_config.HEADERS if current_config else config.HEADERS
+        headers = cfg.HEADERS
+
+    if cfg.SCRAPER_ARCHIVE_MODE == "replay":
+        html = get_page_archive(cfg).get_text(url, at=cfg.SCRAPER_REPLAY_AT)
+        if html is None:
+            print(f"No usable capture of {url} in the page archive.")
+        else:
+            print(f"Replayed page {url} from the page archive")
+        return html
+
     print(f"Attempting to retrieve content from: {url}")
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if cfg.SCRAPER_ARCHIVE_MODE == "capture":
+            get_page_archive(cfg).record_response(response, url) # Error responses are captured too
         response.raise_for_status() # Raise an HTTPError for bad responses (4xx or 5xx)
         print(f"Successfully retrieved page {url}")
         return response.text
@@ -113,9 +139,54 @@ def parse_capital_news(html_content, current_config=None):
             })
     return news_entries
 
-def get_latest_legislative_news(current_config=None, filter_by_current_date=False):
+# Registry of the polled news sites: display name (also the source scheduler key),
+# config setting holding the page URL, and the parser of that page.
+NEWS_SOURCES = [
+    {'name': 'Ministry of Finance', 'url_setting': 'MINISTRY_FINANCE_NEWS_URL', 'parser': parse_minfin_news},
+    {'name': 'AADE', 'url_setting': 'AADE_NEWS_URL', 'parser': parse_aade_news}, # Often 403; the scheduler backs off
+    {'name': 'Capital.gr', 'url_setting': 'CAPITAL_NEWS_URL', 'parser': parse_capital_news},
+]
+
+def scheduler_in_use(current_config=None):
+    """The source scheduler is bypassed when it is disabled and in replay mode (no network involved)."""
+    cfg = current_config if current_config else config
+    return cfg.SCHEDULER_ENABLED and cfg.SCRAPER_ARCHIVE_MODE != "replay"
+
+def poll_source(name, url, parser, current_config=None, force=False, item_id=None, new_only=False, pending=None):
     """
-    Collects the latest legislative news and announcements from all sources.
+    Fetches and parses one source through the source scheduler.
+    Returns the parsed items, or None if the source was not due or could not be fetched.
+    With force=True the source is polled even if it is not due (its health is still recorded).
+    item_id maps a parsed item to the id used to recognise new items (default: its 'url').
+    With new_only=True the items seen by an earlier poll are left out, except those for which
+    pending(item) is true (e.g. ones whose processing failed). Without the scheduler every item counts as new.
+    """
+    cfg = current_config if current_config else config
+    if not scheduler_in_use(cfg):
+        html = fetch_page_content(url, headers=cfg.HEADERS, current_config=cfg)
+        return parser(html, current_config=cfg) if html else None
+
+    scheduler = get_source_scheduler(cfg)
+    if not force and not scheduler.is_due(name):
+        print(f"Skipping {name}: not due yet.")
+        return None
+    started = time.monotonic()
+    html = fetch_page_content(url, headers=cfg.HEADERS, current_config=cfg, timeout=scheduler.timeout_for(name))
+    latency = time.monotonic() - started
+    items = parser(html, current_config=cfg) if html else None
+    item_ids = [item_id(item) if item_id else item['url'] for item in items or []]
+    new_ids = set(scheduler.new_item_ids(name, item_ids))
+    new_items = scheduler.record_poll(name, success=html is not None, latency=latency, item_ids=item_ids)
+    if items:
+        print(f"{name}: {new_items} new of {len(items)} items ({latency:.1f}s).")
+        if new_only:
+            items = [item for item, iid in zip(items, item_ids) if iid in new_ids or (pending and pending(item))]
+    return items
+
+def get_latest_legislative_news(current_config=None, filter_by_current_date=False, force_all_sources=False):
+    """
+    Collects the latest legislative news and announcements from the sources in NEWS_SOURCES.
+    Only the sources the scheduler considers due are polled, unless force_all_sources is True.
     If filter_by_current_date is True, returns only news from the current date.
     """
     all_news_data = []
@@ -123,50 +194,23 @@ def get_latest_legislative_news(current_config=None, filter_by_current_date=Fals
 
     cfg = current_config if current_config else config
 
-    minfin_html = fetch_page_content(cfg.MINISTRY_FINANCE_NEWS_URL, headers=cfg.HEADERS, current_config=cfg)
-    if minfin_html:
-        minfin_data = parse_minfin_news(minfin_html, current_config=cfg)
-        if minfin_data:
-            print(f"Found {len(minfin_data)} news items from Ministry of Finance.")
-            all_news_data.extend(minfin_data)
+    for news_source in NEWS_SOURCES:
+        source_data = poll_source(news_source['name'], getattr(cfg, news_source['url_setting']),
+                                  news_source['parser'], current_config=cfg, force=force_all_sources)
+        if source_data is None:
+            continue
+        if source_data:
+            print(f"Found {len(source_data)} news items from {news_source['name']}.")
+            all_news_data.extend(source_data)
         else:
-            print("No news found from Ministry of Finance with current analysis. Check selectors in parse_minfin_news.")
-
-    # AADE is still commented out due to 403 issues. Uncomment if AADE is fixed.
-    # aade_html = fetch_page_content(cfg.AADE_NEWS_URL, headers=cfg.HEADERS, current_config=cfg)
-    # if aade_html:
-    #     aade_data = parse_aade_news(aade_html, current_config=cfg)
-    #     if aade_data:
-    #         print(f"Found {len(aade_data)} news items from AADE.")
-    #         all_news_data.extend(aade_data)
-    #     else:
-    #         print("No news found from AADE with current analysis. Check selectors in parse_aade_news.")
-    # else:
-    #     print(f"Note: Failed to retrieve AADE page. 403 Forbidden is still possible.")
-
-    capital_html = fetch_page_content(cfg.CAPITAL_NEWS_URL, headers=cfg.HEADERS, current_config=cfg)
-    if capital_html:
-        capital_data = parse_capital_news(capital_html, current_config=cfg)
-        if capital_data:
-            print(f"Found {len(capital_data)} news items from Capital.gr.")
-            all_news_data.extend(capital_data)
-        else:
-            print("No news found from Capital.gr with current analysis. Check selectors in parse_capital_news.")
+            print(f"No news found from {news_source['name']} with current analysis. Check selectors in {news_source['parser'].__name__}.")
+    if scheduler_in_use(cfg):
+        get_source_scheduler(cfg).save()
 
     if all_news_data:
         df = pd.DataFrame(all_news_data)
         df['id'] = df['url']
 
-        greek_month_map = {
-            'Ιανουαρίου': 'January', 'Φεβρουαρίου': 'February', 'Μαρτίου': 'March',
-            'Απριλίου': 'April', 'Μαΐου': 'May', 'Ιουνίου': 'June',
-            'Ιουλίου': 'July', 'Αυγούστου': 'August', 'Σεπτεμβρίου': 'September',
-            'Οκτωβρίου': 'October', 'Νοεμβρίου': 'November', 'Δεκεμβρίου': 'December',
-            'Ιαν': 'Jan', 'Φεβ': 'Feb', 'Μαρ': 'Mar', 'Απρ': 'Apr', 'Μαϊ': 'May',
-            'Ιουν': 'Jun', 'Ιουλ': 'Jul', 'Αυγ': 'Aug', 'Σεπ': 'Sep', 'Οκτ': 'Oct',
-            'Νοε': 'Nov', 'Δεκ': 'Dec'
-        }
-
         date_formats = [
             '%d %B %Y',
             '%d/%m/%Y %H:%M',
@@ -183,7 +227,7 @@ def get_latest_legislative_news(current_config=None, filter_by_current_date=Fals
             if pd.isna(date_str) or not date_str:
                 return pd.NaT
             date_str_processed = str(date_str)
-            for greek, english in greek_month_map.items():
+            for greek, english in GREEK_MONTH_MAP.items():
                 if greek in date_str_processed:
                     date_str_processed = date_str_processed.replace(greek, english)
             if re.search(r'^\d{2}/\d{2} \d{2}:\d{2}$', date_str_processed):
@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import gzip
+import threading
+from datetime import datetime
+
+# Add the project root to the PATH to locate config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+
+DATA_FILE_NAME = 'pages.warc.gz'
+INDEX_FILE_NAME = 'pages.idx'
+
+class PageArchive:
+    """
+    Append-only, WARC-like archive of fetched pages.
+    Every capture is stored as its own gzip member in pages.warc.gz (so the whole file is
+    still a valid .gz stream): one JSON header line (url, timestamp, status, headers,
+    encoding) followed by the raw response body. pages.idx holds one JSON line per capture
+    with its offset and compressed length, so a capture is read back with one seek.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.data_path = os.path.join(archive_dir, DATA_FILE_NAME)
+        self.index_path = os.path.join(archive_dir, INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._index = None # url -> list of index entries, oldest first
+
+    def _load_index(self):
+        if self._index is None:
+            index = {}
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            index.setdefault(entry['url'], []).append(entry)
+            for entries in index.values():
+                entries.sort(key=lambda entry: entry['timestamp'])
+            self._index = index
+        return self._index
+
+    def record(self, url, status, headers, body, encoding=None, timestamp=None):
+        """Appends one capture (body as bytes) and returns its index entry."""
+        timestamp = timestamp or datetime.now().isoformat(timespec='seconds')
+        header = {
+            'url': url, 'timestamp': timestamp, 'status': status,
+            'headers': dict(headers or {}), 'encoding': encoding, 'length': len(body),
+        }
+        member = gzip.compress(json.dumps(header, ensure_ascii=False).encode('utf-8') + b"\n" + body)
+
+        with self._lock:
+            index = self._load_index()
+            os.makedirs(self.archive_dir, exist_ok=True)
+            with open(self.data_path, 'ab') as f:
+                offset = f.tell()
+                f.write(member)
+            entry = {'url': url, 'timestamp': timestamp, 'status': status, 'offset': offset, 'length': len(member)}
+            # The index is written after the data, so it never points at a partial record
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            index.setdefault(url, []).append(entry)
+        return entry
+
+    def record_response(self, response, url=None):
+        """Archives a requests.Response under the requested url (response.url is the one after redirects)."""
+        return self.record(url or response.url, response.status_code, response.headers, response.content,
+                           encoding=response.encoding or response.apparent_encoding)
+
+    def read(self, entry):
+        """Returns (header, body) of an indexed capture."""
+        with open(self.data_path, 'rb') as f:
+            f.seek(entry['offset'])
+            record = gzip.decompress(f.read(entry['length']))
+        header_line, body = record.split(b"\n", 1)
+        return json.loads(header_line), body
+
+    def lookup(self, url, at=None):
+        """Returns the index entry of the latest capture of url (made at or before `at`, if given)."""
+        entries = self._load_index().get(url, [])
+        if at:
+            entries = [entry for entry in entries if entry['timestamp'] <= at]
+        return entries[-1] if entries else None
+
+    def get_text(self, url, at=None):
+        """Returns the archived page as text, or None if it was not captured or the capture was an error response."""
+        entry = self.lookup(url, at=at)
+        if entry is None or entry['status'] >= 400:
+            return None
+        header, body = self.read(entry)
+        return body.decode(header.get('encoding') or 'utf-8', errors='replace')
+
+    def iter_captures(self, url=None, since=None, until=None):
+        """Yields (header, body) of every capture (optionally of one url, within [since, until]), oldest first."""
+        index = self._load_index()
+        urls = [url] if url else list(index)
+        entries = sorted((entry for u in urls for entry in index.get(u, [])), key=lambda entry: entry['offset'])
+        for entry in entries:
+            if (since and entry['timestamp'] < since) or (until and entry['timestamp'] > until):
+                continue
+            yield self.read(entry)
+
+_archives = {}
+
+def get_page_archive(current_config=None):
+    """Returns the (shared) PageArchive configured by SCRAPER_ARCHIVE_DIR_NAME."""
+    cfg = current_config if current_config else config
+    archive_dir = os.path.join(project_root, 'data', cfg.SCRAPER_ARCHIVE_DIR_NAME)
+    if archive_dir not in _archives:
+        _archives[archive_dir] = PageArchive(archive_dir)
+    return _archives[archive_dir]
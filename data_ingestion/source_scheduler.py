@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# Add the project root to the PATH to locate config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+
+SEEN_IDS_PER_SOURCE = 500 # Most recent item ids remembered per source, to tell new items from known ones
+
+class SourceScheduler:
+    """
+    Decides which sources are worth polling on a pipeline run and tracks their health.
+    Per source it keeps exponentially weighted averages of the success rate, the response
+    latency and the share of polls that found new items:
+    - the poll interval shrinks towards SCHEDULER_MIN_INTERVAL for sources that often have
+      something new and grows towards SCHEDULER_MAX_INTERVAL for quiet or unreliable ones;
+    - the request timeout follows the observed latency instead of a fixed 15s;
+    - after SCHEDULER_FAILURE_THRESHOLD consecutive failures the circuit opens and the source
+      is skipped for a backoff that doubles on every further failure (up to SCHEDULER_MAX_BACKOFF).
+      When it expires a single trial poll is let through; a success closes the circuit again.
+    The state is persisted as JSON, so it carries over between runs of the pipeline.
+    """
+
+    def __init__(self, state_path, current_config=None):
+        self.cfg = current_config if current_config else config
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._sources = self._load()
+
+    def _load(self):
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read the source schedule {self.state_path}, starting afresh: {e}")
+        return {}
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._sources, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+    def _source(self, name):
+        if name not in self._sources:
+            # New sources start optimistic: healthy, due now, expected to have news
+            self._sources[name] = {
+                'success_rate': 1.0, 'latency': None, 'new_item_rate': 1.0,
+                'consecutive_failures': 0, 'last_poll': None, 'next_poll': 0.0,
+                'circuit_open_until': 0.0, 'seen_ids': [],
+            }
+        return self._sources[name]
+
+    def _ewma(self, previous, value):
+        if previous is None:
+            return value
+        return self.cfg.SCHEDULER_EWMA_ALPHA * value + (1 - self.cfg.SCHEDULER_EWMA_ALPHA) * previous
+
+    def is_due(self, name, now=None):
+        """True if the source should be polled now (its interval elapsed and its circuit is not open)."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            source = self._source(name)
+            return now >= source['circuit_open_until'] and now >= source['next_poll']
+
+    def timeout_for(self, name):
+        """Request timeout in seconds: a multiple of the observed latency, within the configured bounds."""
+        with self._lock:
+            latency = self._source(name)['latency']
+        if latency is None:
+            return self.cfg.SCHEDULER_MAX_TIMEOUT
+        return min(max(latency * self.cfg.SCHEDULER_TIMEOUT_FACTOR, self.cfg.SCHEDULER_MIN_TIMEOUT), self.cfg.SCHEDULER_MAX_TIMEOUT)
+
+    def _interval(self, source):
+        activity = source['new_item_rate'] * source['success_rate']
+        min_interval, max_interval = self.cfg.SCHEDULER_MIN_INTERVAL, self.cfg.SCHEDULER_MAX_INTERVAL
+        return max_interval - (max_interval - min_interval) * activity
+
+    def poll_interval(self, name):
+        """Seconds between regular polls, from the source's new-item and success rates."""
+        with self._lock:
+            return self._interval(self._source(name))
+
+    @staticmethod
+    def _unseen(source, item_ids):
+        seen_ids = set(source['seen_ids'])
+        return [item_id for item_id in dict.fromkeys(item_ids) if item_id not in seen_ids]
+
+    def new_item_ids(self, name, item_ids):
+        """The item_ids not seen in earlier polls of the source (in order, without duplicates)."""
+        with self._lock:
+            return self._unseen(self._source(name), item_ids)
+
+    def record_poll(self, name, success, latency, item_ids=(), now=None):
+        """
+        Records the outcome of a poll and schedules the next one.
+        item_ids are the ids of the items parsed from the page; the ones not seen before
+        count as new. Returns the number of new items.
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            source = self._source(name)
+            source['last_poll'] = now
+            source['success_rate'] = self._ewma(source['success_rate'], 1.0 if success else 0.0)
+            if latency is not None:
+                source['latency'] = self._ewma(source['latency'], latency)
+
+            new_items = 0
+            if success:
+                new_ids = self._unseen(source, item_ids)
+                new_items = len(new_ids)
+                source['seen_ids'] = (source['seen_ids'] + new_ids)[-SEEN_IDS_PER_SOURCE:]
+                source['new_item_rate'] = self._ewma(source['new_item_rate'], 1.0 if new_items else 0.0)
+                source['consecutive_failures'] = 0
+                source['circuit_open_until'] = 0.0
+                source['next_poll'] = now + self._interval(source)
+            else:
+                source['consecutive_failures'] += 1
+                failures_over = source['consecutive_failures'] - self.cfg.SCHEDULER_FAILURE_THRESHOLD
+                if failures_over >= 0:
+                    backoff = min(self.cfg.SCHEDULER_BASE_BACKOFF * (2 ** failures_over), self.cfg.SCHEDULER_MAX_BACKOFF)
+                    source['circuit_open_until'] = now + backoff
+                    print(f"Source '{name}' failed {source['consecutive_failures']} times in a row; skipped for {backoff / 60:.0f} minutes.")
+                # A failed source is retried on the next run, or once its circuit closes
+                source['next_poll'] = source['circuit_open_until']
+        return new_items
+
+    def health(self):
+        """Returns {source name: summary dict} for display."""
+        now = time.time()
+        with self._lock:
+            return {
+                name: {
+                    'success_rate': round(source['success_rate'], 2),
+                    'latency': round(source['latency'], 2) if source['latency'] is not None else None,
+                    'new_item_rate': round(source['new_item_rate'], 2),
+                    'circuit_open': now < source['circuit_open_until'],
+                    'next_poll_in': max(0, round(max(source['next_poll'], source['circuit_open_until']) - now)),
+                }
+                for name, source in self._sources.items()
+            }
+
+_schedulers = {}
+
+def get_source_scheduler(current_config=None):
+    """Returns the (shared) SourceScheduler stored at SCHEDULER_STATE_FILE_NAME."""
+    cfg = current_config if current_config else config
+    state_path = os.path.join(project_root, 'data', cfg.SCHEDULER_STATE_FILE_NAME)
+    if state_path not in _schedulers:
+        _schedulers[state_path] = SourceScheduler(state_path, current_config=cfg)
+    return _schedulers[state_path]
@@ -0,0 +1,167 @@
+# database/connection_pool.py
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+class ConnectionPool:
+    """
+    Thread-safe SQLite connection management.
+    Reads check out one of at most max_readers reusable read-only connections and return
+    it afterwards, so short-lived threads (Streamlit runs every rerun in a new one) do not
+    open connections of their own. All writes go through a single shared writer connection
+    serialized by a lock. The database runs in WAL mode, so readers are never blocked by
+    the writer (and vice versa).
+    attachments ({schema name: path}) are attached to every connection, read-only
+    on the readers, so queries can join across the databases. A reader attaches an
+    attachment file that does not exist yet as an empty in-memory database, set up with
+    the SQL in fallback_schemas ({schema name: script}) so its tables read as empty.
+    With read_only=True the pool never opens the writer: nothing is created or written.
+    """
+
+    def __init__(self, db_path, busy_timeout=30.0, attachments=None, max_readers=8,
+                 fallback_schemas=None, read_only=False):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.attachments = dict(attachments or {})
+        self.fallback_schemas = dict(fallback_schemas or {})
+        self.max_readers = max_readers
+        self.read_only = read_only
+        self._local = threading.local()           # The connection a thread has checked out, for nested reads
+        self._idle_readers = queue.LifoQueue()    # Most recently returned first: its page cache is warm
+        self._readers = set()                     # Every reader connection opened (idle or checked out)
+        self._reader_slots = 0
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._write_lock = threading.RLock() # Re-entrant so nested write() calls join the open transaction
+
+    def _configure(self, conn):
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        return conn
+
+    def _get_writer(self):
+        """Opens the shared writer connection on first use (caller holds the write lock)."""
+        if self.read_only:
+            raise sqlite3.OperationalError(f"The database is opened read-only: {self.db_path}")
+        if self._writer is None:
+            # isolation_level=None: transactions are opened explicitly in write()
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                   check_same_thread=False, isolation_level=None)
+            self._configure(conn)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            for schema, path in self.attachments.items():
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (path,)) # Creates the file if needed
+                conn.execute(f"PRAGMA {schema}.journal_mode = WAL")
+                conn.execute(f"PRAGMA {schema}.synchronous = NORMAL")
+            self._writer = conn
+            print(f"Successfully connected to the database: {self.db_path}")
+        return self._writer
+
+    def open(self):
+        """Makes sure the database file exists and is in WAL mode."""
+        with self._write_lock:
+            self._get_writer()
+
+    @contextmanager
+    def write(self):
+        """
+        Yields the writer connection inside an IMMEDIATE transaction.
+        Commits on success and rolls back if the block raises.
+        """
+        with self._write_lock:
+            conn = self._get_writer()
+            if conn.in_transaction:
+                # Nested call from the same thread: run inside the outer transaction
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def _open_reader(self):
+        if not self.read_only and not os.path.exists(self.db_path):
+            self.open() # A read before anything was written: create the (empty) database first
+        conn = sqlite3.connect(f"file:{quote(self.db_path)}?mode=ro", uri=True,
+                               timeout=self.busy_timeout, check_same_thread=False)
+        self._configure(conn)
+        for schema, path in self.attachments.items():
+            if os.path.exists(path):
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (f"file:{quote(path)}?mode=ro",))
+            else:
+                conn.execute(f"ATTACH DATABASE ':memory:' AS {schema}")
+                conn.executescript(self.fallback_schemas.get(schema, ""))
+        return conn
+
+    def _checkout_reader(self):
+        """Takes an idle reader, opens a new one below max_readers, or waits for one to be returned."""
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            can_open = self._reader_slots < self.max_readers
+            if can_open:
+                self._reader_slots += 1 # Reserved here, opened outside the lock
+        if can_open:
+            try:
+                conn = self._open_reader()
+            except BaseException:
+                with self._readers_lock:
+                    self._reader_slots -= 1
+                raise
+            with self._readers_lock:
+                self._readers.add(conn)
+            return conn
+        try:
+            return self._idle_readers.get(timeout=self.busy_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"No read connection became available within {self.busy_timeout}s")
+
+    @contextmanager
+    def read(self):
+        """
+        Yields a pooled read-only connection and returns it to the pool afterwards.
+        A read nested in another read of the same thread shares the outer connection.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._checkout_reader()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback() # End a snapshot the block left open
+            with self._readers_lock:
+                pooled = conn in self._readers
+            if pooled:
+                self._idle_readers.put(conn)
+            else:
+                conn.close() # The pool was closed while the connection was checked out
+
+    def close_all(self):
+        """Closes every reader connection and the writer."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._reader_slots = 0
+            self._idle_readers = queue.LifoQueue()
+        self._local = threading.local()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                print("Database connection closed.")
@@ -4,6 +4,9 @@ import sqlite3
 import pandas as pd
 import os
 import sys
+import zlib
+from collections import defaultdict
+from datetime import date, timedelta
 
 # Add the project root to the PATH to locate the config module
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -11,43 +14,133 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 import config
+from database.connection_pool import ConnectionPool
+
+IDS_PER_QUERY = 500 # Ids bound in one IN (...) clause: stays below SQLite's bound-parameter limit
+
+def _chunked_ids(ids):
+    """Yields (chunk, placeholders) for consecutive slices of ids, each small enough for one IN (...) clause."""
+    ids = list(ids)
+    for start in range(0, len(ids), IDS_PER_QUERY):
+        chunk = ids[start:start + IDS_PER_QUERY]
+        yield chunk, ", ".join("?" * len(chunk))
+
+def _compress_text(text):
+    """full_text as stored in the archive tier: zlib-compressed UTF-8."""
+    return zlib.compress(text.encode('utf-8')) if isinstance(text, str) else None
+
+def _decompress_text(value):
+    """Reverses _compress_text; hot-tier values (already text) are returned unchanged."""
+    return zlib.decompress(value).decode('utf-8') if isinstance(value, bytes) else value
 
 class DBManager:
-    def __init__(self, db_name=config.DATABASE_NAME):
+    # Columns added after the first release; create_table() adds them to older databases
+    MIGRATED_COLUMNS = {
+        'rules_version': 'TEXT',
+        'title_lemmas': 'TEXT',
+        'sentiment_method': 'TEXT',
+    }
+
+    # Daily aggregate tables (dimension -> table), kept up to date by insert_opportunities()
+    # so that trend charts never have to scan the opportunities table.
+    AGGREGATE_TABLES = {
+        'source': 'daily_source_stats',
+        'opportunity_type': 'daily_type_stats',
+        'keyword': 'daily_keyword_stats',
+    }
+
+    # Low-cardinality text columns stored as pandas categoricals by fetch_all_opportunities(compact=True)
+    CATEGORICAL_COLUMNS = ['source', 'opportunity_type', 'main_topic']
+
+    # Columns written by insert_opportunities(), in order
+    OPPORTUNITY_COLUMNS = [
+        'id', 'title', 'url', 'date', 'source', 'full_text', 'keywords',
+        'entities', 'main_topic', 'sentiment', 'opportunity_score', 'opportunity_type',
+        'rules_version', 'title_lemmas', 'sentiment_method'
+    ]
+
+    # sentiment_method of sentiment backfilled by fill_missing_sentiment() from the stored keywords.
+    # NULL means the pipeline scored the full lemma stream of the title and description.
+    SENTIMENT_FROM_KEYWORDS = 'keywords'
+
+    # Cold tier: opportunities older than ARCHIVE_AFTER_DAYS, moved by archive_old_opportunities()
+    # into a separate database attached as 'archive', with full_text compressed.
+    ARCHIVE_TABLE = 'archive.opportunities_archive'
+    # Same columns as the hot table, except that full_text holds compressed bytes
+    ARCHIVE_TABLE_SQL = f"""
+        CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            date DATE,
+            source TEXT,
+            full_text BLOB,         -- zlib-compressed UTF-8
+            keywords TEXT,
+            entities TEXT,
+            main_topic TEXT,
+            sentiment TEXT,
+            opportunity_score REAL,
+            opportunity_type TEXT,
+            rules_version TEXT,
+            title_lemmas TEXT,
+            sentiment_method TEXT,
+            added_date TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+    def __init__(self, db_name=config.DATABASE_NAME, read_only=False):
+        """
+        With read_only=True nothing is ever created or written (not even the database file):
+        the write methods report an error, and a missing archive database reads as empty.
+        """
         self.db_path = os.path.join(project_root, 'data', db_name)
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        self.conn = None
+        self.archive_path = os.path.join(project_root, 'data', os.path.splitext(db_name)[0] + '_archive.db')
+        if not read_only:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # A bounded pool of read-only connections and a single serialized writer,
+        # so one DBManager can be shared by every dashboard session.
+        self.pool = ConnectionPool(self.db_path, busy_timeout=config.DB_BUSY_TIMEOUT,
+                                   attachments={'archive': self.archive_path}, max_readers=config.DB_MAX_READERS,
+                                   fallback_schemas={'archive': self.ARCHIVE_TABLE_SQL}, read_only=read_only)
 
     def connect(self):
-        """Connects to the database."""
+        """
+        Opens the database (connections are pooled and reused afterwards).
+        Returns the pool, or None if the database cannot be opened.
+        """
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            print(f"Successfully connected to the database: {self.db_path}")
-            return self.conn
+            self.pool.open()
+            return self.pool
         except sqlite3.Error as e:
             print(f"Error connecting to the database: {e}")
             return None
 
     def close(self):
-        """Closes the database connection."""
-        if self.conn:
-            self.conn.close()
-            print("Database connection closed.")
+        """Closes all pooled connections. Only needed when the process is shutting down."""
+        self.pool.close_all()
 
-    def create_table(self):
+    def create_table(self, drop_existing=False):
         """
         Creates the table for AI opportunities.
-        Drops the table if it already exists to ensure schema is always up-to-date.
+        Existing rows are kept and missing columns are added, so previously scored
+        rows can be rescored later. Pass drop_existing=True to start from an empty table.
         """
-        if not self.conn:
-            self.connect()
-        
-        cursor = self.conn.cursor()
-        
-        # --- NEW ADDITION: Drop table if it exists ---
-        cursor.execute("DROP TABLE IF EXISTS opportunities;")
-        print("Existing 'opportunities' table dropped (if it existed).")
-        # --- END NEW ADDITION ---
+        with self.pool.write() as conn:
+            missing_aggregates = self._create_schema(conn.cursor(), drop_existing)
+        print("The 'opportunities' table is ready with the latest schema.")
+
+        # Databases created before the aggregate tables existed need a one-off backfill
+        if missing_aggregates:
+            self.rebuild_aggregates()
+
+    def _create_schema(self, cursor, drop_existing):
+        """Creates/migrates all tables. Returns True if the aggregate tables had to be created."""
+        if drop_existing:
+            cursor.execute("DROP TABLE IF EXISTS opportunities;")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.ARCHIVE_TABLE}")
+            cursor.execute("DROP TABLE IF EXISTS tier_meta")
+            print("Existing 'opportunities' table dropped (if it existed).")
 
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS opportunities (
@@ -60,14 +153,81 @@ class DBManager:
                 keywords TEXT,       -- NLP result
                 entities TEXT,       -- NLP result
                 main_topic TEXT,     -- NLP result
-                sentiment TEXT,      -- Will be populated later
+                sentiment TEXT,      -- Sentiment score (TEXT affinity: stored as a string, read back as a number)
                 opportunity_score REAL, -- New: Opportunity scoring result (REAL for numbers)
                 opportunity_type TEXT,  -- New: Type of opportunity
+                rules_version TEXT,     -- Hash of the scoring rules used for opportunity_score/type
+                title_lemmas TEXT,      -- NLP result: lemmas of the title, used by the similarity index
+                sentiment_method TEXT,  -- NULL: scored by the pipeline; 'keywords': approximate backfill
                 added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
-        self.conn.commit()
-        print("The 'opportunities' table has been created (or re-created) with the latest schema.")
+
+        cursor.execute(self.ARCHIVE_TABLE_SQL)
+        # Archive watermark: every hot row dated before 'archived_before' has been moved to the archive
+        cursor.execute("CREATE TABLE IF NOT EXISTS tier_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        # Bring tables created by older versions up to the current schema
+        for table, pragma in (('opportunities', "PRAGMA table_info(opportunities)"),
+                              (self.ARCHIVE_TABLE, "PRAGMA archive.table_info(opportunities_archive)")):
+            existing_columns = {row[1] for row in cursor.execute(pragma)}
+            for column, column_type in self.MIGRATED_COLUMNS.items():
+                if column not in existing_columns:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                    print(f"Added missing column '{column}' to the '{table}' table.")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_rules_version ON opportunities (rules_version)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_date ON opportunities (date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS archive.idx_opportunities_archive_date ON opportunities_archive (date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS archive.idx_opportunities_archive_rules_version ON opportunities_archive (rules_version)")
+
+        # Precomputed nearest neighbours of every opportunity (see opportunity_identification/similarity_index.py)
+        if drop_existing:
+            cursor.execute("DROP TABLE IF EXISTS related_opportunities")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS related_opportunities (
+                id TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                related_id TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                PRIMARY KEY (id, rank)
+            )
+        """)
+
+        # Append-only change log read by changes_since(); seq only ever grows (AUTOINCREMENT never reuses values)
+        if drop_existing:
+            cursor.execute("DROP TABLE IF EXISTS opportunity_changes")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS opportunity_changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL,
+                change_type TEXT NOT NULL,   -- 'insert', 'update' or 'score_change'
+                opportunity_score REAL,
+                previous_score REAL,
+                opportunity_type TEXT,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        # Latest change per opportunity, used as the export watermark (see iter_opportunity_chunks)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunity_changes_id ON opportunity_changes (id, seq)")
+
+        existing_tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        missing_aggregates = False
+        for table in self.AGGREGATE_TABLES.values():
+            if drop_existing:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            elif table not in existing_tables:
+                missing_aggregates = True
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    day TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    item_count INTEGER NOT NULL DEFAULT 0,
+                    score_sum REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, label)
+                )
+            """)
+        return missing_aggregates
 
     def insert_opportunities(self, df):
         """
@@ -78,9 +238,6 @@ class DBManager:
             print("No data to insert into the database.")
             return
 
-        if not self.conn:
-            self.connect()
-
         df_copy = df.copy()
         if 'date' in df_copy.columns:
             df_copy['date'] = df_copy['date'].astype(str) # Convert to string (YYYY-MM-DD)
@@ -88,40 +245,456 @@ class DBManager:
         # Define all columns to match the table schema for insertion
         # Ensure all columns expected by the table are present in the DataFrame.
         # Fill missing ones with None, so the INSERT OR REPLACE works.
-        all_table_columns = [
-            'id', 'title', 'url', 'date', 'source', 'full_text', 'keywords', 
-            'entities', 'main_topic', 'sentiment', 'opportunity_score', 'opportunity_type'
-        ]
+        all_table_columns = self.OPPORTUNITY_COLUMNS
         
         # Prepare data by ensuring all columns are present and in correct order
         data_to_insert_or_update = []
         for index, row in df_copy.iterrows():
             row_data = [row.get(col) for col in all_table_columns]
             data_to_insert_or_update.append(row_data)
+        # A repeated id is written once (the last copy wins, as INSERT OR REPLACE would leave it),
+        # so it is also counted once in the aggregates
+        data_to_insert_or_update = list({row[0]: row for row in data_to_insert_or_update}.values())
 
-        cursor = self.conn.cursor()
-        
         # Use INSERT OR REPLACE to either insert new rows or replace existing ones by 'id'
         # This effectively updates the row if 'id' exists.
+        # Everything runs in one transaction, rolled back if an error occurs.
         try:
-            cursor.executemany(f"""
-                INSERT OR REPLACE INTO opportunities (
-                    id, title, url, date, source, full_text, keywords, entities, main_topic, sentiment, opportunity_score, opportunity_type
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, data_to_insert_or_update)
-            self.conn.commit()
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+                # Archived rows scraped again move back to the hot table and are then updated there
+                self._restore_archived(cursor, [row[0] for row in data_to_insert_or_update])
+
+                stored_rows = self._fetch_stored_rows(cursor, [row[0] for row in data_to_insert_or_update], all_table_columns)
+
+                # Replaced rows first give back their contribution to the daily aggregates
+                old_rows = [(row[3], row[4], row[11], row[6], row[10]) for row in stored_rows.values()]
+                new_rows = [(row[3], row[4], row[11], row[6], row[10]) for row in data_to_insert_or_update]
+                self._apply_aggregate_deltas(cursor, old_rows, new_rows)
+                self._log_changes(cursor, [
+                    self._classify_change(stored_rows.get(row[0]), row) for row in data_to_insert_or_update
+                ])
+
+                cursor.executemany(f"""
+                    INSERT OR REPLACE INTO opportunities (
+                        id, title, url, date, source, full_text, keywords, entities, main_topic, sentiment, opportunity_score, opportunity_type,
+                        rules_version, title_lemmas, sentiment_method
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, data_to_insert_or_update)
             print(f"Insertion/update of {len(df)} opportunities completed in the database.")
         except sqlite3.Error as e:
             print(f"Error during bulk insert/update: {e}")
-            self.conn.rollback() # Rollback changes if an error occurs
 
-    def fetch_all_opportunities(self):
-        """Retrieves all opportunities from the database."""
-        if not self.conn:
-            self.connect()
-        
-        df = pd.read_sql_query("SELECT * FROM opportunities ORDER BY date DESC, added_date DESC", self.conn)
+    def rescore_opportunities(self, identifier, batch_size=1000):
+        """
+        Recomputes opportunity_score/opportunity_type from the stored keywords, entities
+        and main_topic for every row scored with a different rule set than the identifier's,
+        in both the hot table and the archive.
+        Works entirely inside the database (no spaCy, no network) and updates in bulk.
+        Returns the number of rescored rows.
+        """
+        rules_version = identifier.rules_version
+        rescored = 0
+        try:
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+                for table in ('opportunities', self.ARCHIVE_TABLE):
+                    rescored += self._rescore_table(cursor, table, identifier, rules_version, batch_size)
+        except sqlite3.Error as e:
+            print(f"Error during rescoring: {e}")
+            return 0
+
+        print(f"Rescored {rescored} opportunities with rule set {rules_version}.")
+        return rescored
+
+    def _rescore_table(self, cursor, table, identifier, rules_version, batch_size):
+        """Rescores the stale rows of one tier (inside the caller's transaction). Returns the number of rows."""
+        rescored = 0
+        cursor.execute(f"""
+            SELECT id, keywords, entities, main_topic, date, source, opportunity_type, opportunity_score
+            FROM {table}
+            WHERE rules_version IS NULL OR rules_version != ?
+        """, (rules_version,))
+        # Read every stale row first so the updates do not disturb the open SELECT cursor
+        stale_rows = cursor.fetchall()
+        for start in range(0, len(stale_rows), batch_size):
+            updates = []
+            old_rows, new_rows = [], []
+            changes = []
+            for oid, keywords, entities, main_topic, day, source, old_type, old_score in stale_rows[start:start + batch_size]:
+                score, opportunity_type = identifier.score_stored_fields(keywords, entities, main_topic)
+                updates.append((score, opportunity_type, rules_version, oid))
+                old_rows.append((day, source, old_type, keywords, old_score))
+                new_rows.append((day, source, opportunity_type, keywords, score))
+                if not self._same_score(old_score, score) or old_type != opportunity_type:
+                    changes.append((oid, 'score_change', score, old_score, opportunity_type))
+            self._apply_aggregate_deltas(cursor, old_rows, new_rows)
+            self._log_changes(cursor, changes)
+            cursor.executemany(f"""
+                UPDATE {table}
+                SET opportunity_score = ?, opportunity_type = ?, rules_version = ?
+                WHERE id = ?
+            """, updates)
+            rescored += len(updates)
+        return rescored
+
+    def fill_missing_sentiment(self, scorer, batch_size=5000):
+        """
+        Fills the sentiment of stored rows (hot and archived) that have none, scoring the stored
+        keyword lemmas with a LexiconSentimentScorer in batches (no spaCy). Returns the number of updated rows.
+        This is an approximation: keywords are a sorted, deduplicated set of content lemmas, so negators
+        ("δεν", "μη") and word order are lost, while the pipeline scores the full ordered lemma stream.
+        The rows are therefore marked with sentiment_method = SENTIMENT_FROM_KEYWORDS, and
+        refine_sentiment() rescores the ones with a full text once spaCy is available.
+        """
+        updated = 0
+        try:
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+                for table in ('opportunities', self.ARCHIVE_TABLE):
+                    cursor.execute(f"SELECT id, keywords FROM {table} WHERE sentiment IS NULL")
+                    missing_rows = cursor.fetchall()
+                    for start in range(0, len(missing_rows), batch_size):
+                        batch = missing_rows[start:start + batch_size]
+                        lemma_lists = [keywords.split(', ') if keywords else [] for _, keywords in batch]
+                        sentiments = scorer.score_batch(lemma_lists)
+                        cursor.executemany(f"UPDATE {table} SET sentiment = ?, sentiment_method = ? WHERE id = ?",
+                                           [(round(float(sentiment), 3), self.SENTIMENT_FROM_KEYWORDS, oid)
+                                            for (oid, _), sentiment in zip(batch, sentiments)])
+                        updated += len(batch)
+        except sqlite3.Error as e:
+            print(f"Error while filling sentiment: {e}")
+            return 0
+
+        print(f"Sentiment filled in for {updated} opportunities.")
+        return updated
+
+    def refine_sentiment(self, nlp_processor, batch_size=500):
+        """
+        Rescores the backfilled (SENTIMENT_FROM_KEYWORDS) sentiment of rows that have a full text, such as
+        Gazette decisions, the way the pipeline does: on the lemma stream of the title and the opening of
+        the text (the pipeline's description is its first 1000 characters). Needs an NLPProcessor (spaCy).
+        Returns the number of updated rows.
+        """
+        updated = 0
+        for table in ('opportunities', self.ARCHIVE_TABLE):
+            with self.pool.read() as conn:
+                rows = conn.execute(f"""
+                    SELECT id, title, full_text FROM {table}
+                    WHERE sentiment_method = ? AND full_text IS NOT NULL
+                """, (self.SENTIMENT_FROM_KEYWORDS,)).fetchall()
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                texts = [(title or "") + " " + _decompress_text(full_text)[:1000] for _, title, full_text in batch]
+                sentiments = nlp_processor.score_sentiment(texts)
+                try:
+                    with self.pool.write() as conn:
+                        # Only rows still marked as backfilled: a re-scrape in between already rescored them
+                        conn.executemany(f"""
+                            UPDATE {table} SET sentiment = ?, sentiment_method = NULL
+                            WHERE id = ? AND sentiment_method = ?
+                        """, [(round(float(sentiment), 3), oid, self.SENTIMENT_FROM_KEYWORDS)
+                              for (oid, _, _), sentiment in zip(batch, sentiments)])
+                except sqlite3.Error as e:
+                    print(f"Error while refining sentiment: {e}")
+                    return updated
+                updated += len(batch)
+
+        if updated:
+            print(f"Sentiment rescored from the full text for {updated} opportunities.")
+        return updated
+
+    def archive_old_opportunities(self, max_age_days=None, batch_size=None):
+        """
+        Moves opportunities dated more than max_age_days ago (default ARCHIVE_AFTER_DAYS) from the hot
+        table to the archive database, compressing their full_text. Works in batches of batch_size rows,
+        each in its own short transaction, so the dashboard is never blocked for long.
+        Afterwards queries only read the archive when their date filter reaches before the cutoff.
+        Returns the number of archived rows.
+        """
+        max_age_days = max_age_days if max_age_days is not None else config.ARCHIVE_AFTER_DAYS
+        batch_size = batch_size or config.ARCHIVE_BATCH_SIZE
+        cutoff = (date.today() - timedelta(days=max_age_days)).isoformat()
+        columns = self.OPPORTUNITY_COLUMNS + ['added_date']
+        full_text_position = columns.index('full_text')
+        archived = 0
+        try:
+            while True:
+                with self.pool.write() as conn:
+                    cursor = conn.cursor()
+                    rows = cursor.execute(f"SELECT {', '.join(columns)} FROM opportunities WHERE date < ? LIMIT ?",
+                                          (cutoff, batch_size)).fetchall()
+                    if not rows:
+                        # Everything before the cutoff is archived now; the watermark never moves back
+                        cursor.execute("""
+                            INSERT INTO tier_meta (key, value) VALUES ('archived_before', ?)
+                            ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+                        """, (cutoff,))
+                        break
+                    rows = [row[:full_text_position] + (_compress_text(row[full_text_position]),) + row[full_text_position + 1:]
+                            for row in rows]
+                    cursor.executemany(f"""
+                        INSERT OR REPLACE INTO {self.ARCHIVE_TABLE} ({', '.join(columns)})
+                        VALUES ({', '.join('?' * len(columns))})
+                    """, rows)
+                    cursor.executemany("DELETE FROM opportunities WHERE id = ?", [(row[0],) for row in rows])
+                    archived += len(rows)
+        except sqlite3.Error as e:
+            print(f"Error while archiving old opportunities: {e}")
+
+        if archived:
+            print(f"Archived {archived} opportunities dated before {cutoff}.")
+        return archived
+
+    def _restore_archived(self, cursor, ids):
+        """Moves the archived rows with the given ids back to the hot table (inside the caller's transaction)."""
+        columns = self.OPPORTUNITY_COLUMNS + ['added_date']
+        full_text_position = columns.index('full_text')
+        for chunk, placeholders in _chunked_ids(ids):
+            rows = cursor.execute(f"SELECT {', '.join(columns)} FROM {self.ARCHIVE_TABLE} WHERE id IN ({placeholders})",
+                                  chunk).fetchall()
+            if not rows:
+                continue
+            rows = [row[:full_text_position] + (_decompress_text(row[full_text_position]),) + row[full_text_position + 1:]
+                    for row in rows]
+            cursor.executemany(f"""
+                INSERT OR REPLACE INTO opportunities ({', '.join(columns)})
+                VALUES ({', '.join('?' * len(columns))})
+            """, rows)
+            cursor.executemany(f"DELETE FROM {self.ARCHIVE_TABLE} WHERE id = ?", [(row[0],) for row in rows])
+
+    def _archive_needed(self, conn, since):
+        """True if a query for rows dated on/after `since` (None: all dates) has to read the archive."""
+        row = conn.execute("SELECT value FROM tier_meta WHERE key = 'archived_before'").fetchone()
+        if row is None:
+            return False # Nothing archived yet
+        return since is None or str(since) < row[0]
+
+    def _tiered_select(self, columns, where="1", params=(), include_archive=True):
+        """
+        Builds a SELECT of `columns` over the hot table and, if include_archive, the archive.
+        The WHERE clause is applied to both parts, so each uses its own indexes. An archive row
+        that is also in the hot table (an interrupted archival batch) is skipped.
+        Returns (sql, params); full_text of archived rows comes back compressed (see _decompress_text).
+        """
+        column_list = ", ".join(columns)
+        sql = f"SELECT {column_list} FROM opportunities WHERE {where}"
+        params = list(params)
+        if include_archive:
+            sql += f"""
+                UNION ALL
+                SELECT {column_list} FROM {self.ARCHIVE_TABLE}
+                WHERE {where} AND id NOT IN (SELECT id FROM opportunities)
+            """
+            params = params + params
+        return sql, params
+
+    def replace_related_opportunities(self, related, replace_all=False):
+        """
+        Stores precomputed neighbour lists, given as {id: [(related_id, similarity), ...]}
+        (most similar first), replacing the stored lists of those ids.
+        With replace_all=True every stored list is discarded first.
+        """
+        if not related and not replace_all:
+            return
+        ids = list(related)
+        rows = [(oid, rank, related_id, similarity)
+                for oid, neighbours in related.items()
+                for rank, (related_id, similarity) in enumerate(neighbours)]
+        try:
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+                if replace_all:
+                    cursor.execute("DELETE FROM related_opportunities")
+                else:
+                    for chunk, placeholders in _chunked_ids(ids):
+                        cursor.execute(f"DELETE FROM related_opportunities WHERE id IN ({placeholders})", chunk)
+                cursor.executemany("INSERT INTO related_opportunities (id, rank, related_id, similarity) VALUES (?, ?, ?, ?)", rows)
+            print(f"Related opportunities updated for {len(ids)} opportunities.")
+        except sqlite3.Error as e:
+            print(f"Error while storing related opportunities: {e}")
+
+    def _fetch_stored_rows(self, cursor, ids, columns):
+        """Returns {id: row tuple of the given columns} for the stored rows with the given ids (columns[0] must be 'id')."""
+        rows = {}
+        for chunk, placeholders in _chunked_ids(ids):
+            cursor.execute(f"SELECT {', '.join(columns)} FROM opportunities WHERE id IN ({placeholders})", chunk)
+            rows.update((row[0], row) for row in cursor.fetchall())
+        return rows
+
+    @staticmethod
+    def _same_score(old_score, new_score):
+        old_missing = old_score is None or old_score != old_score
+        new_missing = new_score is None or new_score != new_score
+        if old_missing or new_missing:
+            return old_missing and new_missing
+        return abs(float(old_score) - float(new_score)) < 1e-9
+
+    def _classify_change(self, stored_row, new_row):
+        """
+        Change-log entry (id, change_type, score, previous_score, type) for writing new_row over stored_row,
+        or None if nothing changed. Rows are tuples in insert_opportunities() column order.
+        """
+        oid, new_score, new_type = new_row[0], new_row[10], new_row[11]
+        new_score = None if new_score is None or new_score != new_score else float(new_score)
+        if stored_row is None:
+            return (oid, 'insert', new_score, None, new_type)
+        if not self._same_score(stored_row[10], new_score) or stored_row[11] != new_type:
+            return (oid, 'score_change', new_score, stored_row[10], new_type)
+
+        # The other values (the score, at position 10, was compared above) come back from SQLite
+        # as text/numbers and arrive from pandas as strings, floats or NaN
+        def normalise(value):
+            return None if value is None or value != value else str(value)
+        if any(normalise(old) != normalise(new) for position, (old, new) in enumerate(zip(stored_row, new_row)) if position != 10):
+            return (oid, 'update', new_score, stored_row[10], new_type)
+        return None
+
+    def _log_changes(self, cursor, changes):
+        """Appends (id, change_type, score, previous_score, type) entries to the change log (None entries are skipped)."""
+        cursor.executemany("""
+            INSERT INTO opportunity_changes (id, change_type, opportunity_score, previous_score, opportunity_type)
+            VALUES (?, ?, ?, ?, ?)
+        """, [change for change in changes if change is not None])
+
+    def changes_since(self, cursor=0, min_score=None, limit=1000):
+        """
+        Returns (changes, next_cursor): the change-log entries with seq > cursor, oldest first, at most limit,
+        joined with the current title/url/date/source of the opportunity (hot or archived).
+        With min_score, only entries whose new score is at least min_score are returned.
+        Pass next_cursor to the following call to continue from where this one stopped.
+        """
+        # Two primary-key lookups per entry; a row in both tiers (an interrupted archival batch) is read from the hot table
+        query = f"""
+            SELECT c.seq, c.id, c.change_type, c.opportunity_score, c.previous_score, c.opportunity_type, c.changed_at,
+                   COALESCE(o.title, a.title) AS title, COALESCE(o.url, a.url) AS url,
+                   COALESCE(o.date, a.date) AS date, COALESCE(o.source, a.source) AS source
+            FROM opportunity_changes c
+            LEFT JOIN opportunities o ON o.id = c.id
+            LEFT JOIN {self.ARCHIVE_TABLE} a ON a.id = c.id
+            WHERE c.seq > ? AND c.seq <= ?
+        """
+        if min_score is not None:
+            query += " AND c.opportunity_score >= ?"
+        query += " ORDER BY c.seq LIMIT ?"
+
+        with self.pool.read() as conn:
+            # The end of the log is read first and bounds the page, so a change committed in between
+            # is left for the next call instead of being skipped by the cursor
+            last_seq = conn.execute("SELECT MAX(seq) FROM opportunity_changes").fetchone()[0] or 0
+            params = [cursor, last_seq] + ([min_score] if min_score is not None else []) + [limit]
+            changes = pd.read_sql_query(query, conn, params=params)
+        if len(changes) == limit:
+            next_cursor = int(changes['seq'].iloc[-1])
+        else:
+            # Everything up to last_seq was scanned, including the entries below min_score
+            next_cursor = max(cursor, last_seq)
+        return changes, next_cursor
+
+    def _apply_aggregate_deltas(self, cursor, old_rows, new_rows):
+        """
+        Subtracts old_rows from and adds new_rows to the daily aggregate tables.
+        Rows are (date, source, opportunity_type, keywords, opportunity_score) tuples.
+        Runs inside the caller's transaction.
+        """
+        deltas = {table: defaultdict(lambda: [0, 0.0]) for table in self.AGGREGATE_TABLES.values()}
+        for sign, rows in ((-1, old_rows), (1, new_rows)):
+            for day, source, opportunity_type, keywords, score in rows:
+                if not day or day in ('None', 'NaT', 'nan'):
+                    continue
+                score = float(score) if score is not None and score == score else 0.0
+                # Missing values may arrive as None or as pandas NaN floats
+                labels = {
+                    'source': [source] if isinstance(source, str) and source else [],
+                    'opportunity_type': [opportunity_type] if isinstance(opportunity_type, str) and opportunity_type else [],
+                    'keyword': set(kw for kw in keywords.split(', ') if kw) if isinstance(keywords, str) else [],
+                }
+                for dimension, table in self.AGGREGATE_TABLES.items():
+                    for label in labels[dimension]:
+                        entry = deltas[table][(str(day), label)]
+                        entry[0] += sign
+                        entry[1] += sign * score
+
+        for table, table_deltas in deltas.items():
+            changed = [(day, label, count, score_sum)
+                       for (day, label), (count, score_sum) in table_deltas.items()
+                       if count != 0 or score_sum != 0]
+            if not changed:
+                continue
+            cursor.executemany(f"""
+                INSERT INTO {table} (day, label, item_count, score_sum) VALUES (?, ?, ?, ?)
+                ON CONFLICT(day, label) DO UPDATE SET
+                    item_count = item_count + excluded.item_count,
+                    score_sum = score_sum + excluded.score_sum
+            """, changed)
+            cursor.execute(f"DELETE FROM {table} WHERE item_count <= 0")
+
+    def rebuild_aggregates(self, batch_size=5000):
+        """Recomputes the daily aggregate tables from scratch (one pass over the hot and archived opportunities)."""
+        try:
+            with self.pool.write() as conn:
+                cursor = conn.cursor()
+                for table in self.AGGREGATE_TABLES.values():
+                    cursor.execute(f"DELETE FROM {table}")
+                read_cursor = conn.cursor()
+                read_cursor.execute(*self._tiered_select(['date', 'source', 'opportunity_type', 'keywords', 'opportunity_score']))
+                while True:
+                    rows = read_cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    self._apply_aggregate_deltas(cursor, [], rows)
+            print("Daily aggregate tables rebuilt.")
+        except sqlite3.Error as e:
+            print(f"Error while rebuilding aggregates: {e}")
+
+    def fetch_daily_trends(self, dimension='source', days=90, top_n=None):
+        """
+        Returns the daily item_count/score_sum per label of a dimension
+        ('source', 'opportunity_type' or 'keyword') for the last `days` days.
+        Reads only the aggregate tables, so the cost depends on the days shown, not the number of articles.
+        With top_n, only the top_n labels by item count in the period are returned.
+        """
+        if dimension not in self.AGGREGATE_TABLES:
+            raise ValueError(f"Unknown trend dimension: {dimension}")
+
+        table = self.AGGREGATE_TABLES[dimension]
+        first_day = (date.today() - timedelta(days=days)).isoformat()
+        query = f"SELECT day, label, item_count, score_sum FROM {table} WHERE day >= ?"
+        params = [first_day]
+        if top_n:
+            query += f"""
+                AND label IN (
+                    SELECT label FROM {table} WHERE day >= ?
+                    GROUP BY label ORDER BY SUM(item_count) DESC LIMIT ?
+                )
+            """
+            params += [first_day, top_n]
+        query += " ORDER BY day"
+
+        with self.pool.read() as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+        df['day'] = pd.to_datetime(df['day'], errors='coerce')
+        return df
+
+    def fetch_all_opportunities(self, compact=False, since=None, include_archive=None):
+        """
+        Retrieves all opportunities from the database, or only those dated on/after `since`.
+        By default (include_archive=None) the archive is only read when `since` reaches before
+        the archive cutoff (or is None), so queries over recent months touch the small hot table alone.
+        include_archive=False reads the hot table only, True both tiers.
+        With compact=True the low-cardinality columns are returned as categoricals,
+        which keeps long-lived (shared) frames small.
+        """
+        columns = self.OPPORTUNITY_COLUMNS + ['added_date']
+        where, params = ("date >= ?", [str(since)]) if since is not None else ("1", [])
+        with self.pool.read() as conn:
+            if include_archive is None:
+                include_archive = self._archive_needed(conn, since)
+            sql, params = self._tiered_select(columns, where, params, include_archive=include_archive)
+            df = pd.read_sql_query(f"SELECT * FROM ({sql}) ORDER BY date DESC, added_date DESC", conn, params=params)
+        if include_archive:
+            df['full_text'] = df['full_text'].map(_decompress_text)
         
         # Convert 'date' column to datetime objects
         df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
@@ -129,33 +702,103 @@ class DBManager:
         # Ensure 'opportunity_score' is numeric for sorting/filtering
         if 'opportunity_score' in df.columns:
             df['opportunity_score'] = pd.to_numeric(df['opportunity_score'], errors='coerce')
+        # The sentiment column has TEXT affinity, so SQLite stores the scores as strings
+        df['sentiment'] = pd.to_numeric(df['sentiment'], errors='coerce')
+
+        if compact:
+            for col in self.CATEGORICAL_COLUMNS:
+                df[col] = df[col].astype('category')
         
         return df
 
-    def get_opportunity_by_id(self, oid):
-        """Retrieves an opportunity by its ID."""
-        if not self.conn:
-            self.connect()
-        
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM opportunities WHERE id = ?", (oid,))
-        row = cursor.fetchone()
+    def last_change_seq(self):
+        """The seq of the newest change-log entry (0 if the log is empty)."""
+        with self.pool.read() as conn:
+            return conn.execute("SELECT MAX(seq) FROM opportunity_changes").fetchone()[0] or 0
+
+    def data_version(self):
+        """
+        A cheap marker of the stored data: (newest change-log seq, archive watermark).
+        It changes whenever opportunities are inserted, rescored or archived, by any process.
+        """
+        with self.pool.read() as conn:
+            last_seq = conn.execute("SELECT MAX(seq) FROM opportunity_changes").fetchone()[0] or 0
+            row = conn.execute("SELECT value FROM tier_meta WHERE key = 'archived_before'").fetchone()
+        return last_seq, row[0] if row else None
+
+    def iter_opportunity_chunks(self, changed_after=None, up_to_seq=None, chunk_size=50000, include_archive=False,
+                                columns=None):
+        """
+        Streams opportunities as DataFrames of at most chunk_size rows, so large exports run in constant memory.
+        The 'export_seq' column holds the seq of the row's latest change-log entry up to up_to_seq (default:
+        the end of the log), or 0 for rows never logged. Change-log seqs are never reused, so of several
+        exported versions of a row the one with the highest export_seq is the latest.
+        With changed_after, only the rows with a change in (changed_after, up_to_seq] are returned.
+        With include_archive, archived opportunities are included (full_text decompressed).
+        columns restricts the chunks to those columns (plus export_seq); by default all are read.
+        All chunks come from one read transaction, so they form a consistent snapshot.
+        """
+        columns = list(columns) if columns is not None else self.OPPORTUNITY_COLUMNS + ['added_date']
+        if 'id' not in columns:
+            columns = ['id'] + columns
+        with self.pool.read() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            if up_to_seq is None:
+                up_to_seq = conn.execute("SELECT MAX(seq) FROM opportunity_changes").fetchone()[0] or 0
+            where, params = "1", []
+            if changed_after is not None:
+                where = "id IN (SELECT id FROM opportunity_changes WHERE seq > ? AND seq <= ?)"
+                params = [changed_after, up_to_seq]
+            sql, params = self._tiered_select(columns, where, params, include_archive=include_archive)
+            query = f"""
+                SELECT COALESCE((SELECT MAX(c.seq) FROM opportunity_changes c WHERE c.id = t.id AND c.seq <= ?), 0) AS export_seq,
+                       t.*
+                FROM ({sql}) t
+            """
+            for chunk in pd.read_sql_query(query, conn, params=[up_to_seq] + params, chunksize=chunk_size):
+                if include_archive and 'full_text' in chunk.columns:
+                    chunk['full_text'] = chunk['full_text'].map(_decompress_text)
+                yield chunk
+
+    def get_opportunity_by_id(self, oid, include_related=False):
+        """
+        Retrieves an opportunity by its ID (from the hot table or the archive).
+        With include_related=True returns (opportunity, related) instead, where related holds the
+        precomputed most similar opportunities (with a 'similarity' column), most similar first.
+        """
+        columns = self.OPPORTUNITY_COLUMNS + ['added_date']
+        related_columns = ['id', 'title', 'url', 'date', 'source', 'opportunity_score', 'opportunity_type']
+        related_df = pd.DataFrame()
+        with self.pool.read() as conn:
+            row = conn.execute(*self._tiered_select(columns, "id = ?", [oid])).fetchone()
+            if include_related and row:
+                related = conn.execute("SELECT related_id, similarity FROM related_opportunities WHERE id = ? ORDER BY rank",
+                                       (oid,)).fetchall()
+                if related:
+                    related_ids = [related_id for related_id, _ in related]
+                    sql, params = self._tiered_select(related_columns, f"id IN ({', '.join('?' * len(related_ids))})", related_ids)
+                    related_df = pd.read_sql_query(sql, conn, params=params)
+        if not related_df.empty:
+            similarities = dict(related)
+            related_df['similarity'] = related_df['id'].map(similarities)
+            related_df = related_df.sort_values('similarity', ascending=False, kind='stable').reset_index(drop=True)
+            related_df['date'] = pd.to_datetime(related_df['date'], errors='coerce').dt.date
+        df = pd.DataFrame()
         if row:
-            columns = [description[0] for description in cursor.description]
             df = pd.DataFrame([row], columns=columns)
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
-            if 'opportunity_score' in df.columns:
-                df['opportunity_score'] = pd.to_numeric(df['opportunity_score'], errors='coerce')
-            return df
-        return pd.DataFrame()
+            df['full_text'] = df['full_text'].map(_decompress_text)
+            df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
+            df['opportunity_score'] = pd.to_numeric(df['opportunity_score'], errors='coerce')
+            df['sentiment'] = pd.to_numeric(df['sentiment'], errors='coerce')
+        return (df, related_df) if include_related else df
 
 # Test function for the module (if executed directly)
 if __name__ == "__main__":
     print("Running db_manager.py directly (for testing).")
     db_manager = DBManager()
     db_manager.connect()
-    db_manager.create_table() # This will now drop and recreate the table
+    db_manager.create_table(drop_existing=True) # Start the test from an empty table
 
     # Create a test DataFrame with NLP and opportunity fields
     test_data = {
@@ -170,7 +813,8 @@ if __name__ == "__main__":
         'full_text': [None, None, None],
         'sentiment': [None, None, None],
         'opportunity_score': [10.0, 5.0, 15.0], # Example scores
-        'opportunity_type': ['Γενική Φορολογική Είδηση', 'Αναπτυξιακά / Κίνητρα / Επιδότηση', 'Αλλαγή Φορολογικής Νομοθεσίας']
+        'opportunity_type': ['Γενική Φορολογική Είδηση', 'Αναπτυξιακά / Κίνητρα / Επιδότηση', 'Αλλαγή Φορολογικής Νομοθεσίας'],
+        'rules_version': ['test', 'test', 'test']
     }
     test_df = pd.DataFrame(test_data)
 
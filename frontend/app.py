@@ -1,13 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 import sys
-import importlib
-from datetime import datetime, date
-import requests
+from datetime import datetime, date, timedelta
 import json
 import re
 import time # <-- ΑΠΑΡΑΙΤΗΤΗ ΠΡΟΣΘΗΚΗ
+import threading
 
 # --- Project Root Setup ---
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -15,23 +15,28 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # --- Module Imports and Initialization ---
+# Only the DB layer is imported at start-up: rendering the dashboard needs nothing else.
+# The scraping and NLP stacks (requests, BeautifulSoup, pypdf, spaCy, SciPy) are imported
+# by run_pipeline()/rescore_stored_opportunities() the first time they run in the process,
+# plotly when the trends chart is drawn and requests when the chatbot calls the API.
+# (utils/startup_benchmark.py measures this import path.)
 try:
     # These imports assume you have local files with these names.
     # If the app is a single file, you might not need these.
     import config
-    importlib.reload(config)
-    from data_ingestion import legislative_scraper
-    importlib.reload(legislative_scraper)
-    from nlp_processing import nlp_processor
-    importlib.reload(nlp_processor)
     from database import db_manager
-    importlib.reload(db_manager)
-    from opportunity_identification import opportunity_identifier
-    importlib.reload(opportunity_identifier)
+    from data_ingestion import source_scheduler
+
+    @st.cache_resource(show_spinner=False)
+    def get_db_manager():
+        """One pooled DBManager shared by every session and rerun of this process."""
+        manager = db_manager.DBManager(read_only=config.DASHBOARD_READ_ONLY)
+        if not config.DASHBOARD_READ_ONLY:
+            # Schema migrations are left to the instance that writes (a replica may share the file read-only)
+            manager.create_table()
+        return manager
 
-    db_manager_instance = db_manager.DBManager()
-    nlp_processor_instance = nlp_processor.NLPProcessor()
-    opportunity_identifier_instance = opportunity_identifier.OpportunityIdentifier()
+    db_manager_instance = get_db_manager()
 
 except Exception as e:
     # This error will show if the local files (config.py, etc.) are not found.
@@ -39,32 +44,147 @@ except Exception as e:
     st.info("Βεβαιωθείτε ότι τα αρχεία .py (config, legislative_scraper, κ.λπ.) βρίσκονται στον σωστό κατάλογο.")
     st.stop()
 
+@st.cache_resource(show_spinner=False)
+def get_nlp_processor():
+    """The spaCy-based NLPProcessor, loaded (model included) on the first pipeline run of the process."""
+    from nlp_processing import nlp_processor
+    return nlp_processor.NLPProcessor()
+
+@st.cache_resource(show_spinner=False)
+def get_opportunity_identifier():
+    from opportunity_identification import opportunity_identifier
+    return opportunity_identifier.OpportunityIdentifier()
+
+@st.cache_resource(show_spinner=False)
+def get_webhook_lock():
+    """Lets one webhook dispatch run at a time in this process."""
+    return threading.Lock()
+
+def dispatch_webhook():
+    """
+    Sends the new opportunity changes to WEBHOOK_URL, if one is configured, in a background thread:
+    retries with backoff can take minutes and must not block the page.
+    If a dispatch is still running, it is left to pick up the new changes (or the next dispatch will).
+    """
+    if not config.WEBHOOK_URL:
+        return
+    lock = get_webhook_lock()
+    if not lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            from data_export import webhook_dispatcher
+            webhook_dispatcher.WebhookDispatcher(db_manager_instance).dispatch()
+        finally:
+            lock.release()
+
+    threading.Thread(target=run, name="webhook-dispatch", daemon=True).start()
+
 st.set_page_config(layout="wide", page_title="AI Product Opportunity Identifier")
 
 # --- Core Application Functions ---
 
-def run_pipeline():
+def run_pipeline(force_all_sources=False):
     """Scrapes, processes, and stores new opportunity data."""
     with st.spinner("Εκτελείται η διαδικασία συλλογής & ανάλυσης δεδομένων... Αυτό μπορεί να διαρκέσει μερικά λεπτά."):
-        latest_legislative_news_df = legislative_scraper.get_latest_legislative_news(current_config=config, filter_by_current_date=False)
+        from data_ingestion import legislative_scraper, gazette_scraper
+        from opportunity_identification import similarity_index
+
+        latest_legislative_news_df = legislative_scraper.get_latest_legislative_news(current_config=config, filter_by_current_date=False, force_all_sources=force_all_sources)
+        latest_gazette_df = gazette_scraper.get_latest_gazette_items(current_config=config, force=force_all_sources)
+        latest_legislative_news_df = pd.concat([latest_legislative_news_df, latest_gazette_df], ignore_index=True)
 
         processed_df = pd.DataFrame()
         if not latest_legislative_news_df.empty:
-            processed_df = nlp_processor_instance.process_dataframe(latest_legislative_news_df)
+            processed_df = get_nlp_processor().process_dataframe(latest_legislative_news_df)
         
         identified_opportunities_df = pd.DataFrame()
         if not processed_df.empty:
-            identified_opportunities_df = opportunity_identifier_instance.identify_and_score_opportunities(processed_df)
+            identified_opportunities_df = get_opportunity_identifier().identify_and_score_opportunities(processed_df)
 
-        db_manager_instance.connect()
-        db_manager_instance.create_table()
         if not identified_opportunities_df.empty:
             db_manager_instance.insert_opportunities(identified_opportunities_df)
-        db_manager_instance.close()
+            similarity_index.update_similarity_index(db_manager_instance, identified_opportunities_df)
+        if not processed_df.empty:
+            # spaCy is loaded now: backfilled sentiment of rows with a full text is scored properly
+            db_manager_instance.refine_sentiment(get_nlp_processor())
+        db_manager_instance.archive_old_opportunities()
+        dispatch_webhook()
+        load_shared_frame.clear()
+        load_daily_trends.clear()
 
     st.success("Η διαδικασία ολοκληρώθηκε! Τα δεδομένα ανανεώθηκαν.")
     return identified_opportunities_df
 
+def rescore_stored_opportunities():
+    """Applies the current scoring rules to stored rows scored with an older rule set and fills in missing sentiment."""
+    with st.spinner("Επανυπολογισμός βαθμολογιών με τους τρέχοντες κανόνες..."):
+        from nlp_processing.sentiment import LexiconSentimentScorer
+
+        rescored_count = db_manager_instance.rescore_opportunities(get_opportunity_identifier())
+        # Sentiment is scored from the stored lemmas, so rescoring does not need spaCy
+        db_manager_instance.fill_missing_sentiment(LexiconSentimentScorer())
+        dispatch_webhook()
+        load_shared_frame.clear()
+        load_daily_trends.clear()
+    st.success(f"Επανυπολογίστηκαν {rescored_count} ευκαιρίες.")
+
+@st.cache_resource(ttl=600, max_entries=4, show_spinner=False)
+def load_shared_frame(data_version, include_archive=False):
+    """
+    Loads the scored opportunities once per process and data version, with categorical columns.
+    data_version (DBManager.data_version()) changes whenever any process writes or archives
+    opportunities, so those changes show on the next rerun; the TTL also picks up the
+    sentiment refinements, which the change log does not record.
+    Without include_archive only the hot table is loaded (whatever its dates: rows only leave it
+    once archive_old_opportunities() moved them, and undated rows stay there).
+    """
+    all_stored_data_df = db_manager_instance.fetch_all_opportunities(compact=True, include_archive=include_archive)
+    if all_stored_data_df.empty:
+        return all_stored_data_df
+    shared_df = all_stored_data_df[all_stored_data_df['opportunity_score'] > 0]
+    shared_df = shared_df.sort_values(by='opportunity_score', ascending=False).reset_index(drop=True)
+    for col in db_manager.DBManager.CATEGORICAL_COLUMNS:
+        shared_df[col] = shared_df[col].cat.remove_unused_categories()
+    shared_df.attrs['data_version'] = data_version # Identifies this version of the data in cache keys
+    return shared_df
+
+def load_shared_opportunities(include_archive=False):
+    """
+    Returns the current shared frame as a shallow copy: it shares the column data with every
+    session, and pandas' copy-on-write copies a column only if a session writes to it,
+    so the shared frame itself is never modified.
+    """
+    shared_df = load_shared_frame(db_manager_instance.data_version(), include_archive)
+    return shared_df.copy(deep=False)
+
+def filter_opportunity_positions(df, search_query, selected_source, selected_type):
+    """Returns the row positions matching the filters, without copying the frame."""
+    mask = np.ones(len(df), dtype=bool)
+    if search_query:
+        mask &= (
+            df['title'].str.contains(search_query, case=False, na=False) |
+            df['keywords'].str.contains(search_query, case=False, na=False)
+        ).to_numpy()
+    if selected_source != "Όλες":
+        mask &= (df['source'] == selected_source).to_numpy()
+    if selected_type != "Όλοι":
+        mask &= (df['opportunity_type'] == selected_type).to_numpy()
+    return np.flatnonzero(mask)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_csv_export(data_version, include_archive, search_query, selected_source, selected_type):
+    """Builds the CSV bytes for a filter combination; only called once the user asks for the file."""
+    shared_df = load_shared_frame(data_version, include_archive)
+    positions = filter_opportunity_positions(shared_df, search_query, selected_source, selected_type)
+    return shared_df.iloc[positions].to_csv(index=False).encode('utf-8')
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_daily_trends(dimension, days, top_n=None):
+    """Reads the pre-aggregated daily trends (cost depends on the days shown, not on the number of articles)."""
+    return db_manager_instance.fetch_daily_trends(dimension=dimension, days=days, top_n=top_n)
+
 # ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
 # --- ΑΛΛΑΓΗ 1: Η ΣΥΝΑΡΤΗΣΗ ΑΝΤΙΚΑΤΑΣΤΑΘΗΚΕ ΜΕ ΤΗ ΣΩΣΤΗ, ΠΙΟ ΣΤΑΘΕΡΗ ΕΚΔΟΣΗ ---
 def generate_gemini_response(chat_history, api_key, context_str):
@@ -72,6 +192,8 @@ def generate_gemini_response(chat_history, api_key, context_str):
     if not api_key:
         return "Παρακαλώ εισαγάγετε το Gemini API Key σας στην πλαϊνή μπάρα."
 
+    import requests
+
     api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
     
     headers = {"Content-Type": "application/json"}
@@ -133,8 +255,26 @@ with st.sidebar:
     else:
         st.success("Το κλειδί API φορτώθηκε με επιτυχία.")
 
-    if st.button("Ανανέωση Δεδομένων & Εντοπισμός Ευκαιριών", help="Εκτελέστε ξανά όλη τη διαδικασία για να βρείτε νέες ευκαιρίες."):
-        st.session_state['refresh_data'] = True
+    # Read-only replicas (DASHBOARD_READ_ONLY) only show the data refreshed by another instance,
+    # so they never import the scraping and NLP stacks
+    force_all_sources = False
+    if not config.DASHBOARD_READ_ONLY:
+        if st.button("Ανανέωση Δεδομένων & Εντοπισμός Ευκαιριών", help="Εκτελέστε ξανά όλη τη διαδικασία για να βρείτε νέες ευκαιρίες."):
+            st.session_state['refresh_data'] = True
+        force_all_sources = st.checkbox("Έλεγχος όλων των πηγών", help="Συλλογή από όλες τις πηγές, ακόμη και αυτές που ο προγραμματιστής θα παρέλειπε σε αυτή την εκτέλεση.")
+    include_archive = st.checkbox("Συμπερίληψη αρχειοθετημένων ευκαιριών", help=f"Εμφάνιση και των ευκαιριών παλαιότερων των {config.ARCHIVE_AFTER_DAYS} ημερών (πιο αργή φόρτωση).")
+    with st.expander("Κατάσταση Πηγών"):
+        source_health = source_scheduler.get_source_scheduler(config).health()
+        if source_health:
+            st.dataframe(pd.DataFrame.from_dict(source_health, orient='index').rename(columns={
+                'success_rate': 'Επιτυχία', 'latency': 'Χρόνος (s)', 'new_item_rate': 'Νέα',
+                'circuit_open': 'Σε αναμονή', 'next_poll_in': 'Επόμενη (s)'
+            }))
+        else:
+            st.caption("Δεν έχει γίνει ακόμη συλλογή δεδομένων.")
+
+    if not config.DASHBOARD_READ_ONLY and st.button("Επανυπολογισμός Βαθμολογιών", help="Εφαρμόστε τους τρέχοντες κανόνες βαθμολόγησης στις αποθηκευμένες ευκαιρίες χωρίς νέα συλλογή δεδομένων."):
+        rescore_stored_opportunities()
 
     st.markdown("---")
     st.subheader("Σχετικά με την Εφαρμογή")
@@ -148,8 +288,6 @@ with st.sidebar:
     st.markdown("---")
 
 # --- Session State Initialization ---
-if 'last_identified_df' not in st.session_state:
-    st.session_state['last_identified_df'] = pd.DataFrame()
 if 'chat_history' not in st.session_state:
     st.session_state['chat_history'] = []
 if 'show_chatbot' not in st.session_state:
@@ -159,26 +297,16 @@ if 'refresh_data' not in st.session_state:
 
 # --- Data Loading Logic ---
 if st.session_state.refresh_data:
-    identified_opportunities_df = run_pipeline()
-    st.session_state['last_identified_df'] = identified_opportunities_df
+    run_pipeline(force_all_sources=force_all_sources)
     st.session_state.chat_history = []
     st.session_state.refresh_data = False
     st.rerun()
 else:
-    if st.session_state.last_identified_df.empty:
-        with st.spinner("Φόρτωση αρχικών δεδομένων από τη βάση..."):
-            db_manager_instance.connect()
-            all_stored_data_df = db_manager_instance.fetch_all_opportunities()
-            db_manager_instance.close()
-
-            if not all_stored_data_df.empty:
-                identified_opportunities_df = all_stored_data_df[all_stored_data_df['opportunity_score'] > 0].copy()
-                identified_opportunities_df = identified_opportunities_df.sort_values(by='opportunity_score', ascending=False)
-            else:
-                identified_opportunities_df = pd.DataFrame()
-            st.session_state['last_identified_df'] = identified_opportunities_df
-    else:
-        identified_opportunities_df = st.session_state['last_identified_df']
+    # Sessions keep no copy of the data: they all read the same shared frame
+    with st.spinner("Φόρτωση αρχικών δεδομένων από τη βάση..."):
+        identified_opportunities_df = load_shared_opportunities(include_archive)
+
+filtered_positions = np.arange(0)
 
 # --- Display Identified Opportunities ---
 st.subheader("Επισκόπηση Εντοπισμένων Ευκαιριών")
@@ -194,29 +322,21 @@ else:
     search_query = st.text_input("Αναζήτηση με Τίτλο ή Λέξεις-Κλειδιά:", "")
     col_filter1, col_filter2 = st.columns(2)
     with col_filter1:
-        unique_sources = ["Όλες"] + list(identified_opportunities_df['source'].unique())
+        unique_sources = ["Όλες"] + list(identified_opportunities_df['source'].cat.categories)
         selected_source = st.selectbox("Φίλτρο ανά Πηγή:", unique_sources)
     with col_filter2:
-        unique_types = ["Όλοι"] + list(identified_opportunities_df['opportunity_type'].dropna().unique())
+        unique_types = ["Όλοι"] + list(identified_opportunities_df['opportunity_type'].cat.categories)
         selected_type = st.selectbox("Φίλτρο ανά Τύπο Ευκαιρίας:", unique_types)
 
-    filtered_df = identified_opportunities_df.copy()
-    if search_query:
-        filtered_df = filtered_df[
-            filtered_df['title'].str.contains(search_query, case=False, na=False) |
-            filtered_df['keywords'].str.contains(search_query, case=False, na=False)
-        ]
-    if selected_source != "Όλες":
-        filtered_df = filtered_df[filtered_df['source'] == selected_source]
-    if selected_type != "Όλοι":
-        filtered_df = filtered_df[filtered_df['opportunity_type'] == selected_type]
+    filtered_positions = filter_opportunity_positions(identified_opportunities_df, search_query, selected_source, selected_type)
 
-    if filtered_df.empty:
+    if len(filtered_positions) == 0:
         st.info("Δεν βρέθηκαν ευκαιρίες που να ταιριάζουν με τα επιλεγμένα φίλτρα.")
     else:
         display_cols = ['title', 'date', 'source', 'opportunity_score', 'opportunity_type', 'url', 'keywords', 'main_topic']
+        display_col_positions = [identified_opportunities_df.columns.get_loc(col) for col in display_cols]
         st.dataframe(
-            filtered_df[display_cols],
+            identified_opportunities_df.iloc[filtered_positions, display_col_positions],
             use_container_width=True,
             hide_index=True,
             column_config={
@@ -227,13 +347,78 @@ else:
                 "title": st.column_config.TextColumn("Τίτλος", width="large"),
             }
         )
-        csv_data = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Λήψη Δεδομένων ως CSV",
-            data=csv_data,
-            file_name="identified_opportunities.csv",
-            mime="text/csv"
+        # The CSV is only generated when requested, and then reused for the same filters
+        export_key = (identified_opportunities_df.attrs.get('data_version'), include_archive, search_query, selected_source, selected_type)
+        if st.button("Προετοιμασία Αρχείου CSV"):
+            st.session_state['csv_export_key'] = export_key
+        if st.session_state.get('csv_export_key') == export_key:
+            st.download_button(
+                label="Λήψη Δεδομένων ως CSV",
+                data=build_csv_export(*export_key),
+                file_name="identified_opportunities.csv",
+                mime="text/csv"
+            )
+
+        # Related announcements come precomputed from the similarity index: one lookup per selection
+        st.markdown("#### Παρόμοιες Προηγούμενες Ανακοινώσεις")
+        shown_positions = filtered_positions[:100]
+        selected_position = st.selectbox(
+            "Επιλέξτε ευκαιρία:", shown_positions,
+            format_func=lambda position: identified_opportunities_df['title'].iat[position],
         )
+        _, related_df = db_manager_instance.get_opportunity_by_id(
+            identified_opportunities_df['id'].iat[selected_position], include_related=True
+        )
+        if related_df.empty:
+            st.caption("Δεν βρέθηκαν παρόμοιες ανακοινώσεις.")
+        else:
+            st.dataframe(
+                related_df[['title', 'date', 'source', 'opportunity_type', 'similarity', 'url']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "url": st.column_config.LinkColumn("URL", display_text="Σύνδεσμος"),
+                    "date": st.column_config.DateColumn("Ημερομηνία", format="DD/MM/YYYY"),
+                    "similarity": st.column_config.ProgressColumn("Ομοιότητα", min_value=0.0, max_value=1.0, format="%.2f"),
+                    "opportunity_type": "Τύπος",
+                    "title": st.column_config.TextColumn("Τίτλος", width="large"),
+                }
+            )
+
+st.markdown("---")
+
+# --- Trends ---
+st.subheader("Τάσεις Ευκαιριών")
+trend_dimensions = {
+    "Πηγή": "source",
+    "Τύπος Ευκαιρίας": "opportunity_type",
+    "Λέξη-Κλειδί": "keyword",
+}
+trend_metrics = {
+    "Πλήθος Ευκαιριών": "item_count",
+    "Άθροισμα Βαθμολογίας": "score_sum",
+}
+col_trend1, col_trend2, col_trend3 = st.columns(3)
+with col_trend1:
+    selected_dimension = st.selectbox("Ανάλυση ανά:", list(trend_dimensions.keys()))
+with col_trend2:
+    selected_metric = st.selectbox("Μέγεθος:", list(trend_metrics.keys()))
+with col_trend3:
+    trend_days = st.slider("Ημέρες:", min_value=7, max_value=365, value=90, step=7)
+
+dimension = trend_dimensions[selected_dimension]
+trends_df = load_daily_trends(dimension, trend_days, top_n=10 if dimension == "keyword" else None)
+if trends_df.empty:
+    st.info("Δεν υπάρχουν ακόμη δεδομένα τάσεων για την επιλεγμένη περίοδο.")
+else:
+    import plotly.express as px
+
+    metric = trend_metrics[selected_metric]
+    trend_fig = px.line(
+        trends_df, x="day", y=metric, color="label", markers=True,
+        labels={"day": "Ημερομηνία", metric: selected_metric, "label": selected_dimension},
+    )
+    st.plotly_chart(trend_fig, use_container_width=True)
 
 st.markdown("---")
 
@@ -286,7 +471,7 @@ if st.session_state.show_chatbot:
             with st.spinner("Σκέφτομαι..."):
                 # ▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼▼
                 # --- ΑΛΛΑΓΗ 3: ΤΟ CONTEXT ΣΤΕΛΝΕΤΑΙ ΠΛΕΟΝ ΜΕ ΚΑΘΑΡΟ ΤΡΟΠΟ ---
-                context_df = filtered_df
+                context_df = identified_opportunities_df.iloc[filtered_positions[:10]]
                 context_str = ""
                 if not context_df.empty:
                     for _, row in context_df.head(10).iterrows():
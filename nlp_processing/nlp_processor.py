@@ -9,6 +9,7 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 import config
+from nlp_processing.sentiment import LexiconSentimentScorer
 
 class NLPProcessor:
     def __init__(self):
@@ -26,6 +27,7 @@ class NLPProcessor:
             raise
         
         self.tax_keywords = config.TAX_KEYWORDS
+        self.sentiment_scorer = LexiconSentimentScorer()
 
     def process_text(self, text):
         """
@@ -34,8 +36,16 @@ class NLPProcessor:
         if not text or not isinstance(text, str):
             return [], [], None
 
-        doc = self.nlp(text)
-        
+        keywords, entities, main_topic, _ = self._analyse_doc(self.nlp(text), text)
+        return keywords, entities, main_topic
+
+    def _analyse_doc(self, doc, text):
+        """
+        Extracts keywords, entities and main topic from a parsed spaCy doc.
+        Also returns the lemmas of all tokens (in order), used for sentiment scoring.
+        """
+        lemmas = [token.lemma_.lower() for token in doc if not token.is_punct and not token.is_space]
+
         # Keyword Extraction
         keywords = []
         for token in doc:
@@ -60,25 +70,50 @@ class NLPProcessor:
         elif any(kw in keywords for kw in ["πρόγραμμα", "εσπα", "ανάπτυξη", "επιδότηση", "κίνητρα"]):
             main_topic = "Development Programs / Incentives"
             
-        return keywords, entities, main_topic
+        return keywords, entities, main_topic, lemmas
 
-    def process_dataframe(self, df):
+    def process_dataframe(self, df, batch_size=64):
         """
         Processes a DataFrame, adding columns with NLP results.
+        Texts are parsed in batches with nlp.pipe, and the sentiment of the whole
+        DataFrame is scored in one vectorised pass over the lemmas.
         """
         if df.empty:
             return df
 
+        rows = df.to_dict('records')
+        texts = [row.get('title', '') + " " + (row.get('description', '') or "") for row in rows]
+
         processed_data = []
-        for index, row in df.iterrows():
-            text_to_process = row.get('title', '') + " " + (row.get('description', '') or "")
-            keywords, entities, main_topic = self.process_text(text_to_process)
+        lemma_lists = []
+        for row, text_to_process, doc in zip(rows, texts, self.nlp.pipe(texts, batch_size=batch_size)):
+            keywords, entities, main_topic, lemmas = self._analyse_doc(doc, text_to_process)
             
-            processed_row = row.to_dict()
+            processed_row = dict(row)
             processed_row['keywords'] = ", ".join(keywords)
             processed_row['entities'] = str(entities)
             processed_row['main_topic'] = main_topic
+            # The title comes first in the parsed text: its tokens are the ones starting inside it
+            title_length = len(row.get('title', ''))
+            processed_row['title_lemmas'] = ", ".join(dict.fromkeys(
+                token.lemma_.lower() for token in doc
+                if token.idx < title_length and token.is_alpha and not token.is_stop
+            ))
             
             processed_data.append(processed_row)
+            lemma_lists.append(lemmas)
+
+        # Stored together with the other NLP fields when the rows are inserted
+        sentiments = self.sentiment_scorer.score_batch(lemma_lists)
+        for processed_row, sentiment in zip(processed_data, sentiments):
+            processed_row['sentiment'] = round(float(sentiment), 3)
         
-        return pd.DataFrame(processed_data)
\ No newline at end of file
+        return pd.DataFrame(processed_data)
+
+    def score_sentiment(self, texts, batch_size=64):
+        """Scores the sentiment of texts as process_dataframe() does (on their full lemma streams)."""
+        lemma_lists = [
+            [token.lemma_.lower() for token in doc if not token.is_punct and not token.is_space]
+            for doc in self.nlp.pipe(texts, batch_size=batch_size)
+        ]
+        return self.sentiment_scorer.score_batch(lemma_lists)
\ No newline at end of file
@@ -0,0 +1,72 @@
+import itertools
+import numpy as np
+
+# Polarity of common lemmas in Greek tax/economic news, from -1 (negative) to 1 (positive).
+# Keys are lower-case lemmas, as produced by NLPProcessor.
+GREEK_SENTIMENT_LEXICON = {
+    # Positive
+    "ελάφρυνση": 0.8, "απαλλαγή": 0.7, "κίνητρο": 0.6, "επιδότηση": 0.5, "ενίσχυση": 0.6,
+    "στήριξη": 0.6, "ανάπτυξη": 0.6, "ανάκαμψη": 0.7, "επένδυση": 0.4, "χρηματοδότηση": 0.5,
+    "βελτίωση": 0.7, "διευκόλυνση": 0.6, "απλοποίηση": 0.6, "αναβάθμιση": 0.6, "παράταση": 0.4,
+    "επιστροφή": 0.4, "έκπτωση": 0.5, "όφελος": 0.7, "ευκαιρία": 0.7, "επιτυχία": 0.8,
+    "σταθερότητα": 0.5, "πλεόνασμα": 0.5, "μείωση": 0.3, "ρύθμιση": 0.2, "θετικός": 0.8,
+    "ευνοϊκός": 0.7, "ισχυρός": 0.4, "αναπτυξιακός": 0.5, "δίκαιος": 0.5, "εξοικονόμηση": 0.5,
+    # Negative
+    "πρόστιμο": -0.7, "κύρωση": -0.7, "επιβάρυνση": -0.8, "προσαύξηση": -0.6, "φοροδιαφυγή": -0.8,
+    "εισφοροδιαφυγή": -0.8, "λαθρεμπόριο": -0.7, "απάτη": -0.9, "διαφθορά": -0.9, "παράβαση": -0.7,
+    "παράνομος": -0.7, "χρέος": -0.5, "οφειλή": -0.4, "πλειστηριασμός": -0.8, "κατάσχεση": -0.8,
+    "ύφεση": -0.8, "κρίση": -0.7, "έλλειμμα": -0.6, "πληθωρισμός": -0.5, "ανεργία": -0.6,
+    "καθυστέρηση": -0.5, "ζημία": -0.7, "πτώση": -0.4, "απειλή": -0.6, "λουκέτο": -0.7,
+    "αρνητικός": -0.8, "ακρίβεια": -0.5, "έλεγχος": -0.2, "αβεβαιότητα": -0.6, "ταλαιπωρία": -0.6,
+}
+
+# A negator flips the polarity of the lemma that follows it ("δεν βελτιώνεται", "χωρίς κίνητρα")
+GREEK_NEGATORS = ["δεν", "μη", "μην", "χωρίς", "ούτε"]
+
+class LexiconSentimentScorer:
+    """
+    Local lexicon-based sentiment over lemmas, scored a whole batch at a time.
+    All lemmas of a batch are looked up at once in a sorted vocabulary array, and the
+    per-document sums are NumPy reductions, so there is no Python loop per token.
+    """
+
+    def __init__(self, lexicon=None, negators=None, alpha=2.0):
+        lexicon = lexicon if lexicon is not None else GREEK_SENTIMENT_LEXICON
+        items = sorted(lexicon.items())
+        # Sorted vocabulary + aligned polarity array: lemma -> polarity via np.searchsorted
+        self.vocabulary = np.array([lemma for lemma, _ in items], dtype=str)
+        self.polarities = np.array([polarity for _, polarity in items], dtype=np.float64)
+        self.negators = np.array(sorted(negators if negators is not None else GREEK_NEGATORS), dtype=str)
+        self.alpha = alpha # Normalisation constant of the compound score
+
+    @staticmethod
+    def _lookup(sorted_values, tokens):
+        """Returns (positions, found) of every token in a sorted array."""
+        if len(sorted_values) == 0:
+            return np.zeros(len(tokens), dtype=np.int64), np.zeros(len(tokens), dtype=bool)
+        positions = np.minimum(np.searchsorted(sorted_values, tokens), len(sorted_values) - 1)
+        return positions, sorted_values[positions] == tokens
+
+    def score_batch(self, lemma_lists):
+        """
+        Scores a batch of documents, each given as a list of lemmas.
+        Returns an array with one compound score in [-1, 1] per document (0 = neutral).
+        """
+        n_docs = len(lemma_lists)
+        lengths = np.fromiter((len(lemmas) for lemmas in lemma_lists), dtype=np.int64, count=n_docs)
+        if lengths.sum() == 0 or len(self.vocabulary) == 0:
+            return np.zeros(n_docs)
+
+        tokens = np.array(list(itertools.chain.from_iterable(lemma_lists)), dtype=str)
+        doc_ids = np.repeat(np.arange(n_docs), lengths)
+
+        positions, found = self._lookup(self.vocabulary, tokens)
+        polarity = np.where(found, self.polarities[positions], 0.0)
+
+        _, is_negator = self._lookup(self.negators, tokens)
+        negated = np.zeros(len(tokens), dtype=bool)
+        negated[1:] = is_negator[:-1] & (doc_ids[1:] == doc_ids[:-1])
+        polarity = np.where(negated, -polarity, polarity)
+
+        totals = np.bincount(doc_ids, weights=polarity, minlength=n_docs)
+        return totals / np.sqrt(totals * totals + self.alpha)
@@ -1,14 +1,14 @@
 import pandas as pd
 import os
 import sys
-import importlib
+import json
+import hashlib
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 import config
-importlib.reload(config)
 
 class OpportunityIdentifier:
     def __init__(self):
@@ -36,6 +36,31 @@ class OpportunityIdentifier:
             "general_news_with_keywords": 1             # New rule: give a base score if any tax keyword is present
         }
 
+    @property
+    def rules_version(self):
+        """
+        Short hash of the scoring rules and keyword lists.
+        Stored with every scored row so that stale rows can be rescored after a rule change.
+        """
+        rule_set = {
+            'scoring_rules': self.scoring_rules,
+            'tax_opportunity_keywords': self.tax_opportunity_keywords,
+            'incentive_keywords': self.incentive_keywords,
+            'debt_keywords': self.debt_keywords,
+            'aade_keywords': self.aade_keywords,
+            'law_change_keywords': self.law_change_keywords,
+        }
+        payload = json.dumps(rule_set, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def score_stored_fields(self, keywords, entities, main_topic):
+        """
+        Scores an already NLP-processed record from its stored fields.
+        Returns (opportunity_score, opportunity_type) without touching spaCy or the network.
+        """
+        row = {'keywords': keywords, 'entities': entities, 'main_topic': main_topic}
+        return self._calculate_score(row), self._assign_opportunity_type(row)
+
     def _calculate_score(self, row):
         """Calculates a score for each opportunity based on the defined rules."""
         score = 0
@@ -122,6 +147,7 @@ class OpportunityIdentifier:
 
         df['opportunity_score'] = df.apply(self._calculate_score, axis=1)
         df['opportunity_type'] = df.apply(self._assign_opportunity_type, axis=1)
+        df['rules_version'] = self.rules_version
 
         # Filter for opportunities with a score > 0
         opportunities_df = df[df['opportunity_score'] > 0].copy()
@@ -0,0 +1,259 @@
+# opportunity_identification/similarity_index.py
+
+import os
+import sys
+import re
+import zlib
+import unicodedata
+
+import numpy as np
+import scipy.sparse as sp
+
+# Add the project root to the PATH to locate the config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+
+DEFAULT_INDEX_PATH = os.path.join(project_root, 'data', config.SIMILARITY_INDEX_FILE_NAME)
+SIMILARITY_CHUNK_SIZE = 256 # Changed rows compared against the whole index at a time
+TITLE_TOKEN = re.compile(r'\w{3,}')
+
+def _strip_accents(text):
+    return "".join(char for char in unicodedata.normalize('NFD', text) if unicodedata.category(char) != 'Mn')
+
+def opportunity_terms(keywords, title_lemmas=None, title=None):
+    """
+    Returns the terms of one opportunity: its keyword lemmas plus the lemmas of its title.
+    Rows stored before title lemmas were kept fall back to the lower-case, accent-free title words.
+    """
+    terms = [kw for kw in keywords.split(', ') if kw] if isinstance(keywords, str) else []
+    if isinstance(title_lemmas, str) and title_lemmas:
+        terms.extend(lemma for lemma in title_lemmas.split(', ') if lemma)
+    elif isinstance(title, str):
+        terms.extend(word for word in TITLE_TOKEN.findall(_strip_accents(title.lower())) if not word.isdigit())
+    return terms
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour index of the stored opportunities over hashed TF-IDF vectors.
+    Terms are hashed (crc32) into n_features columns, so there is no vocabulary to keep:
+    the index is a sparse matrix of term counts plus the document frequencies, saved as one .npz.
+    The top-k neighbours of every row are kept alongside and written to the related_opportunities
+    table, so the dashboard reads them with one indexed lookup. update() only compares the new or
+    changed rows against the index; older rows pick up a new row when it beats their current neighbours.
+    The IDF weights are frozen when the lists are computed in full (recompute()), so incremental updates
+    keep every list exact for that IDF. As rows are added the document frequencies drift from it, which is
+    why update_similarity_index() rebuilds the index once it has grown by SIMILARITY_IDF_REBUILD_GROWTH.
+    """
+
+    def __init__(self, index_path=DEFAULT_INDEX_PATH, n_features=None, top_k=None, min_similarity=None):
+        self.index_path = index_path
+        self.n_features = n_features or config.SIMILARITY_HASH_FEATURES
+        self.top_k = top_k or config.SIMILARITY_TOP_K
+        self.min_similarity = min_similarity if min_similarity is not None else config.SIMILARITY_MIN_SCORE
+        self.ids = np.array([], dtype=object)
+        self.counts = sp.csr_matrix((0, self.n_features), dtype=np.float32)
+        self.doc_freq = np.zeros(self.n_features, dtype=np.int64)
+        # Document frequencies and row count the IDF weights were frozen with (by recompute())
+        self.idf_doc_freq = np.zeros(self.n_features, dtype=np.int64)
+        self.idf_docs = 0
+        self.neighbours = np.full((0, self.top_k), -1, dtype=np.int32)
+        self.neighbour_sims = np.zeros((0, self.top_k), dtype=np.float32)
+        self._positions = {}
+
+    @classmethod
+    def load(cls, index_path=DEFAULT_INDEX_PATH):
+        """Loads a saved index, or returns an empty one if there is none (or it was built with other settings)."""
+        index = cls(index_path)
+        if not os.path.exists(index_path):
+            return index
+        with np.load(index_path, allow_pickle=False) as saved:
+            n_features, top_k = (int(value) for value in saved['settings'])
+            if n_features != index.n_features or top_k != index.top_k or 'idf_doc_freq' not in saved:
+                print("Similarity settings changed; the index will be rebuilt.")
+                return index
+            index.ids = saved['ids'].astype(object)
+            index.counts = sp.csr_matrix((saved['data'], saved['indices'], saved['indptr']),
+                                         shape=(len(index.ids), index.n_features))
+            index.doc_freq = saved['doc_freq']
+            index.idf_doc_freq = saved['idf_doc_freq']
+            index.idf_docs = int(saved['idf_docs'])
+            index.neighbours = saved['neighbours']
+            index.neighbour_sims = saved['neighbour_sims']
+        index._positions = {oid: position for position, oid in enumerate(index.ids)}
+        return index
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = self.index_path + '.tmp.npz'
+        np.savez_compressed(
+            tmp_path, settings=np.array([self.n_features, self.top_k]),
+            ids=self.ids.astype(str), data=self.counts.data, indices=self.counts.indices, indptr=self.counts.indptr,
+            doc_freq=self.doc_freq, idf_doc_freq=self.idf_doc_freq, idf_docs=np.array(self.idf_docs),
+            neighbours=self.neighbours, neighbour_sims=self.neighbour_sims,
+        )
+        os.replace(tmp_path, self.index_path)
+
+    def _hash_counts(self, term_lists):
+        """Term lists -> sparse matrix of hashed term counts (one row per list)."""
+        indptr, indices = [0], []
+        for terms in term_lists:
+            indices.extend(zlib.crc32(term.encode('utf-8')) % self.n_features for term in terms)
+            indptr.append(len(indices))
+        matrix = sp.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                               shape=(len(term_lists), self.n_features))
+        matrix.sum_duplicates()
+        return matrix
+
+    def _weighted(self, counts):
+        """TF-IDF weighting (sublinear tf, smoothed idf from the frozen document frequencies) with L2-normalised rows."""
+        idf = np.log((1 + self.idf_docs) / (1 + self.idf_doc_freq)).astype(np.float32) + 1
+        weighted = counts.copy()
+        weighted.data = 1 + np.log(weighted.data)
+        weighted = sp.csr_matrix(weighted.multiply(idf))
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1))).ravel()
+        norms[norms == 0] = 1
+        return sp.csr_matrix(sp.diags(1 / norms) @ weighted, dtype=np.float32)
+
+    def update(self, rows):
+        """
+        Adds or replaces rows, given as dicts with 'id', 'keywords' and 'title_lemmas'/'title',
+        and refreshes the neighbour lists they affect.
+        Returns {id: [(related_id, similarity), ...]} for every row whose list changed.
+        """
+        rows = list({row['id']: row for row in rows}.values())
+        if not rows:
+            return {}
+        positions = self._add_rows(rows)
+
+        before = self.neighbours.copy()
+        vectors = self._weighted(self.counts)
+        for start in range(0, len(positions), SIMILARITY_CHUNK_SIZE):
+            self._merge_neighbours(vectors, np.sort(positions[start:start + SIMILARITY_CHUNK_SIZE]))
+
+        changed = np.flatnonzero((self.neighbours != before).any(axis=1))
+        changed = np.union1d(changed, positions) # Replaced rows may keep the same neighbours with new scores
+        return {self.ids[position]: self.related(position) for position in changed}
+
+    def _add_rows(self, rows):
+        """Stores the term counts of rows (with distinct ids) without touching the neighbour lists. Returns their positions."""
+        new_counts = self._hash_counts([
+            opportunity_terms(row.get('keywords'), row.get('title_lemmas'), row.get('title')) for row in rows
+        ])
+
+        # Replaced rows keep their position; their old terms leave the document frequencies
+        positions = np.array([self._positions.get(row['id'], -1) for row in rows], dtype=np.int64)
+        replaced = positions >= 0
+        if replaced.any():
+            self.doc_freq -= np.bincount(self.counts[positions[replaced]].indices, minlength=self.n_features)
+        appended = np.flatnonzero(~replaced)
+        positions[appended] = len(self.ids) + np.arange(len(appended))
+        self.ids = np.concatenate([self.ids, np.array([rows[i]['id'] for i in appended], dtype=object)])
+        for i in appended:
+            self._positions[rows[i]['id']] = positions[i]
+
+        # Row order of the stacked matrix: existing rows, then the new versions of the changed rows
+        order = np.arange(self.counts.shape[0] + len(appended))
+        order[positions] = self.counts.shape[0] + np.arange(len(rows))
+        self.counts = sp.csr_matrix(sp.vstack([self.counts, new_counts])[order])
+        self.doc_freq += np.bincount(new_counts.indices, minlength=self.n_features)
+        self.neighbours = np.vstack([self.neighbours, np.full((len(appended), self.top_k), -1, dtype=np.int32)])
+        self.neighbour_sims = np.vstack([self.neighbour_sims, np.zeros((len(appended), self.top_k), dtype=np.float32)])
+        return positions
+
+    def recompute(self, freeze_idf=True):
+        """
+        Recomputes every neighbour list in full, after freezing the IDF at the current document
+        frequencies (with freeze_idf=False the lists are recomputed for the IDF already frozen).
+        """
+        if freeze_idf:
+            self.idf_doc_freq = self.doc_freq.copy()
+            self.idf_docs = len(self.ids)
+        vectors = self._weighted(self.counts)
+        for start in range(0, len(self.ids), SIMILARITY_CHUNK_SIZE):
+            chunk = np.arange(start, min(start + SIMILARITY_CHUNK_SIZE, len(self.ids)))
+            sims = (vectors[chunk] @ vectors.T).toarray()
+            sims[np.arange(len(chunk)), chunk] = -np.inf # A row is not its own neighbour
+            sims[sims < self.min_similarity] = -np.inf
+            top, top_sims = self._top_k(sims)
+            self.neighbours[chunk] = top
+            self.neighbour_sims[chunk] = np.where(top >= 0, top_sims, 0)
+
+    def _top_k(self, sims):
+        """Column positions and values of the top_k largest entries per row (position -1 where fewer are finite)."""
+        sims = np.hstack([sims, np.full((len(sims), self.top_k), -np.inf)]) # Padding for rows with few candidates
+        top = np.argpartition(-sims, self.top_k - 1, axis=1)[:, :self.top_k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind='stable')
+        top, top_sims = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_sims, order, axis=1)
+        return np.where(np.isfinite(top_sims), top, -1), top_sims
+
+    def _merge_neighbours(self, vectors, changed):
+        """Recomputes the neighbours of the changed rows and offers them as candidates to the other rows."""
+        sims = (vectors[changed] @ vectors.T).toarray() # (changed rows) x (all rows)
+        sims[np.arange(len(changed)), changed] = -np.inf # A row is not its own neighbour
+        sims[sims < self.min_similarity] = -np.inf
+
+        # Rows that had a changed (replaced) row as a neighbour may now need one that was never kept:
+        # they are recomputed in full, like the changed rows. Other rows similar to a changed row merge it in.
+        stale = np.setdiff1d(np.flatnonzero(np.isin(self.neighbours, changed).any(axis=1)), changed)
+        affected = np.setdiff1d(np.flatnonzero(np.isfinite(sims).any(axis=0)), np.union1d(changed, stale))
+        if len(affected):
+            neighbours = self.neighbours[affected]
+            # Changed rows are dropped from the current lists and offered again with their fresh similarity
+            current_sims = np.where(np.isin(neighbours, changed) | (neighbours < 0), -np.inf, self.neighbour_sims[affected])
+            candidate_ids = np.hstack([neighbours, np.broadcast_to(changed.astype(np.int32), (len(affected), len(changed)))])
+            top, top_sims = self._top_k(np.hstack([current_sims, sims[:, affected].T]))
+            candidate_ids = np.hstack([candidate_ids, np.full((len(affected), self.top_k), -1, dtype=np.int32)])
+            self.neighbours[affected] = np.where(top >= 0, np.take_along_axis(candidate_ids, np.maximum(top, 0), axis=1), -1)
+            self.neighbour_sims[affected] = np.where(top >= 0, top_sims, 0)
+
+        # The changed and stale rows: best matches over the whole index
+        if len(stale):
+            stale_sims = (vectors[stale] @ vectors.T).toarray()
+            stale_sims[np.arange(len(stale)), stale] = -np.inf
+            stale_sims[stale_sims < self.min_similarity] = -np.inf
+            changed, sims = np.concatenate([changed, stale]), np.vstack([sims, stale_sims])
+        top, top_sims = self._top_k(sims)
+        self.neighbours[changed] = top
+        self.neighbour_sims[changed] = np.where(top >= 0, top_sims, 0)
+
+    def related(self, position):
+        """[(related_id, similarity), ...] of the row at position, most similar first."""
+        return [(self.ids[neighbour], round(float(similarity), 4))
+                for neighbour, similarity in zip(self.neighbours[position], self.neighbour_sims[position])
+                if neighbour >= 0]
+
+def update_similarity_index(db_manager, df, index_path=DEFAULT_INDEX_PATH):
+    """Adds newly inserted opportunities (a DataFrame) to the index and stores the changed neighbour lists."""
+    if df.empty:
+        return 0
+    index = SimilarityIndex.load(index_path)
+    # The IDF is refreshed by a rebuild once the index has grown well past the rows it was frozen with
+    if len(index.ids) == 0 or len(index.ids) + len(df) > index.idf_docs * config.SIMILARITY_IDF_REBUILD_GROWTH:
+        return rebuild_similarity_index(db_manager, index_path)
+    changed = index.update(df.to_dict('records'))
+    index.save()
+    db_manager.replace_related_opportunities(changed)
+    return len(changed)
+
+def rebuild_similarity_index(db_manager, index_path=DEFAULT_INDEX_PATH):
+    """Builds the index from every stored opportunity (hot and archived) and replaces all neighbour lists."""
+    index = SimilarityIndex(index_path)
+    chunks = db_manager.iter_opportunity_chunks(columns=['id', 'keywords', 'title_lemmas', 'title'],
+                                                chunk_size=config.EXPORT_CHUNK_SIZE, include_archive=True)
+    for chunk in chunks:
+        index._add_rows(chunk.to_dict('records'))
+    index.recompute()
+    changed = {index.ids[position]: index.related(position) for position in range(len(index.ids))}
+    index.save()
+    db_manager.replace_related_opportunities(changed, replace_all=True)
+    print(f"Similarity index rebuilt over {len(index.ids)} opportunities.")
+    return len(changed)
+
+if __name__ == "__main__":
+    from database.db_manager import DBManager
+
+    rebuild_similarity_index(DBManager())
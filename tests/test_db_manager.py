@@ -0,0 +1,171 @@
+# tests/test_db_manager.py
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from database.db_manager import DBManager
+from data_export.parquet_exporter import ParquetExporter, load_snapshot
+
+def opportunity(number, score=20.0, day='2099-01-01', title=None):
+    return {
+        'id': f'u{number}', 'title': title or f'Είδηση {number}', 'url': f'u{number}', 'date': day,
+        'source': 'TestSource', 'keywords': 'φόρος, δήλωση', 'opportunity_score': score, 'opportunity_type': 'Τύπος',
+    }
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DBManager(str(tmp_path / 'test.db')) # An absolute path keeps the database out of data/
+    manager.create_table()
+    yield manager
+    manager.close()
+
+def test_repeated_id_is_stored_and_logged_once(db):
+    db.insert_opportunities(pd.DataFrame([opportunity(1, score=5.0), opportunity(1, score=7.0)]))
+    changes, _ = db.changes_since(0)
+    assert list(changes['change_type']) == ['insert']
+    assert db.fetch_all_opportunities()['opportunity_score'].tolist() == [7.0]
+    with db.pool.read() as conn:
+        assert conn.execute("SELECT item_count, score_sum FROM daily_source_stats").fetchall() == [(1, 7.0)]
+
+def test_changes_since_does_not_skip_a_change_committed_during_the_read(db, monkeypatch):
+    db.insert_opportunities(pd.DataFrame([opportunity(1)]))
+    read_sql_query = pd.read_sql_query
+
+    def read_with_concurrent_insert(*args, **kwargs):
+        monkeypatch.setattr(pd, 'read_sql_query', read_sql_query)
+        db.insert_opportunities(pd.DataFrame([opportunity(2)]))
+        return read_sql_query(*args, **kwargs)
+
+    monkeypatch.setattr(pd, 'read_sql_query', read_with_concurrent_insert)
+    changes, cursor = db.changes_since(0, min_score=10)
+    assert list(changes['id']) == ['u1']
+    changes, cursor = db.changes_since(cursor, min_score=10)
+    assert list(changes['id']) == ['u2']
+
+def test_changes_of_archived_rows_carry_their_fields(db):
+    db.insert_opportunities(pd.DataFrame([opportunity(1, day='2000-01-01', title='Παλιά είδηση')]))
+    assert db.archive_old_opportunities() == 1
+    _, cursor = db.changes_since(0)
+
+    class Identifier:
+        rules_version = 'new-rules'
+        def score_stored_fields(self, keywords, entities, main_topic):
+            return 42.0, 'Νέος Τύπος'
+
+    assert db.rescore_opportunities(Identifier()) == 1
+    changes, _ = db.changes_since(cursor)
+    assert list(changes['change_type']) == ['score_change']
+    assert changes[['title', 'url', 'date', 'source']].iloc[0].tolist() == ['Παλιά είδηση', 'u1', '2000-01-01', 'TestSource']
+
+def test_hot_table_view_keeps_old_and_undated_rows_until_archived(db):
+    db.insert_opportunities(pd.DataFrame([opportunity(1, day='2000-01-01'), opportunity(2, day=None), opportunity(3)]))
+    assert sorted(db.fetch_all_opportunities(include_archive=False)['id']) == ['u1', 'u2', 'u3']
+    db.archive_old_opportunities()
+    assert sorted(db.fetch_all_opportunities(include_archive=False)['id']) == ['u2', 'u3']
+    assert sorted(db.fetch_all_opportunities(include_archive=True)['id']) == ['u1', 'u2', 'u3']
+
+def test_parquet_export_survives_archival_and_includes_the_archive(db, tmp_path):
+    exporter = ParquetExporter(db, export_dir=str(tmp_path / 'export'))
+    db.insert_opportunities(pd.DataFrame([opportunity(1, day='2000-01-01'), opportunity(2), opportunity(3)]))
+    exporter.export()
+    # u4 is archived before any export sees it; archival frees rowids that later inserts may reuse
+    db.insert_opportunities(pd.DataFrame([opportunity(4, day='2000-02-01')]))
+    db.archive_old_opportunities()
+    db.insert_opportunities(pd.DataFrame([opportunity(5), opportunity(2, score=9.0)]))
+    assert exporter.export()['rows'] == 3
+    latest = load_snapshot(exporter.export_dir).to_pandas().set_index('id')
+    assert sorted(latest.index) == ['u1', 'u2', 'u3', 'u4', 'u5']
+    assert latest.loc['u2', 'opportunity_score'] == 9.0
+    assert exporter.export(incremental=False)['rows'] == 5
+
+def test_read_only_manager_never_opens_the_writer(db, tmp_path):
+    db.insert_opportunities(pd.DataFrame([opportunity(1)]))
+    db.close()
+    os.remove(db.archive_path)
+    reader = DBManager(str(tmp_path / 'test.db'), read_only=True)
+    assert list(reader.fetch_all_opportunities(include_archive=True)['id']) == ['u1']
+    reader.insert_opportunities(pd.DataFrame([opportunity(2)])) # Reported, not written
+    assert list(reader.fetch_all_opportunities()['id']) == ['u1']
+    assert reader.pool._writer is None
+    assert not os.path.exists(reader.archive_path)
+    reader.close()
+
+def test_sentiment_is_read_and_exported_as_a_number(db, tmp_path):
+    db.insert_opportunities(pd.DataFrame([dict(opportunity(1), sentiment=0.25)]))
+    assert db.fetch_all_opportunities()['sentiment'].tolist() == [0.25]
+    assert db.get_opportunity_by_id('u1')['sentiment'].tolist() == [0.25]
+    exporter = ParquetExporter(db, export_dir=str(tmp_path / 'export'))
+    exporter.export()
+    sentiment = load_snapshot(exporter.export_dir, columns=['sentiment'])['sentiment']
+    assert sentiment.type == 'double' and sentiment.to_pylist() == [0.25]
+
+class RecordingIdentifier:
+    rules_version = 'current'
+
+    def __init__(self):
+        self.scored = []
+
+    def score_stored_fields(self, keywords, entities, main_topic):
+        self.scored.append(keywords)
+        return 42.0, 'Νέος Τύπος'
+
+def test_rescoring_touches_only_rows_with_stale_rules(db):
+    db.insert_opportunities(pd.DataFrame([
+        dict(opportunity(1), rules_version='old', keywords='παλιό'),
+        dict(opportunity(2), rules_version=None, keywords='χωρίς έκδοση'),
+        dict(opportunity(3, score=15.0), rules_version='current', keywords='τρέχον'),
+    ]))
+    _, cursor = db.changes_since(0)
+    identifier = RecordingIdentifier()
+    assert db.rescore_opportunities(identifier) == 2
+    assert sorted(identifier.scored) == ['παλιό', 'χωρίς έκδοση']
+    stored = db.fetch_all_opportunities().set_index('id')
+    assert stored.loc[['u1', 'u2'], 'opportunity_score'].tolist() == [42.0, 42.0]
+    assert stored.loc['u3', ['opportunity_score', 'opportunity_type']].tolist() == [15.0, 'Τύπος']
+    assert set(stored['rules_version']) == {'current'}
+    changes, _ = db.changes_since(cursor)
+    assert sorted(changes['id']) == ['u1', 'u2']
+    # Every row is current now: a second run has nothing to do
+    assert db.rescore_opportunities(RecordingIdentifier()) == 0
+
+def test_fill_missing_sentiment_only_fills_empty_rows(db):
+    from nlp_processing.sentiment import LexiconSentimentScorer
+
+    db.insert_opportunities(pd.DataFrame([
+        dict(opportunity(1), keywords='ελάφρυνση, κίνητρο'),
+        dict(opportunity(2), keywords='πρόστιμο'),
+        dict(opportunity(3), keywords='πρόστιμο', sentiment=0.5),
+    ]))
+    assert db.fill_missing_sentiment(LexiconSentimentScorer()) == 2
+    stored = db.fetch_all_opportunities().set_index('id')
+    assert stored.loc['u1', 'sentiment'] > 0 > stored.loc['u2', 'sentiment']
+    assert stored.loc['u3', 'sentiment'] == 0.5
+    assert stored.loc[['u1', 'u2'], 'sentiment_method'].tolist() == [DBManager.SENTIMENT_FROM_KEYWORDS] * 2
+    assert pd.isna(stored.loc['u3', 'sentiment_method'])
+    assert db.fill_missing_sentiment(LexiconSentimentScorer()) == 0
+
+def test_id_lists_longer_than_one_query_are_chunked(db, monkeypatch):
+    from database import db_manager
+    monkeypatch.setattr(db_manager, 'IDS_PER_QUERY', 2)
+    old_rows = [opportunity(number, day='2000-01-01') for number in range(5)]
+    db.insert_opportunities(pd.DataFrame(old_rows))
+    assert db.archive_old_opportunities() == 5
+    # Re-inserting archived ids restores them to the hot table and logs them as updates
+    _, cursor = db.changes_since(0)
+    db.insert_opportunities(pd.DataFrame([dict(row, opportunity_score=30.0) for row in old_rows]))
+    assert db.fetch_all_opportunities(include_archive=False)['opportunity_score'].tolist() == [30.0] * 5
+    assert db.fetch_all_opportunities(include_archive=True)['id'].nunique() == 5
+    changes, _ = db.changes_since(cursor)
+    assert len(changes) == 5 and 'insert' not in set(changes['change_type'])
+    db.replace_related_opportunities({f'u{number}': [('u0', 0.5)] for number in range(1, 5)})
+    db.replace_related_opportunities({f'u{number}': [] for number in range(1, 5)})
+    with db.pool.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM related_opportunities").fetchone()[0] == 0
@@ -0,0 +1,112 @@
+# tests/test_gazette_scraper.py
+#
+# fixtures/gazette_issue.pdf is a two-page issue dated 15.03.2024 with two decisions
+# ("(1)" / "Αριθμ. Α.1054" and "(2)" / "Αριθμ. 12345"). Every page carries the running
+# header (ΕΦΗΜΕΡΙΣ ΤΗΣ ΚΥΒΕΡΝΗΣΕΩΣ, Τεύχος Β 1234/15.03.2024) and a page number, and the
+# first decision continues on the second page.
+
+import os
+import shutil
+import sys
+from datetime import date
+from types import SimpleNamespace
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+from data_ingestion import gazette_scraper, legislative_scraper
+from data_ingestion.gazette_scraper import (
+    PAGE_BOILERPLATE, cached_pdf_path, get_latest_gazette_items, iter_pdf_pages, parse_issue_date, split_decisions,
+)
+
+FIXTURE_PDF = os.path.join(os.path.dirname(__file__), 'fixtures', 'gazette_issue.pdf')
+
+def test_parse_issue_date_numeric():
+    assert parse_issue_date("Τεύχος Β 1234/15.03.2024") == date(2024, 3, 15)
+
+def test_parse_issue_date_greek_month():
+    assert parse_issue_date("Αθήνα, 7 Μαΐου 2024") == date(2024, 5, 7)
+
+def test_parse_issue_date_missing_or_invalid():
+    assert parse_issue_date("Χωρίς ημερομηνία") is None
+    assert parse_issue_date("31.02.2024") is None
+
+def test_page_boilerplate_lines():
+    for line in ["ΕΦΗΜΕΡΙΣ ΤΗΣ ΚΥΒΕΡΝΗΣΕΩΣ", "Τεύχος Β 1234/15.03.2024", "1234", "*02012340503240*"]:
+        assert PAGE_BOILERPLATE.match(line), line
+    for line in ["Αποφασίζουμε την παράταση έως 30 Απριλίου.", "(1)", "Αριθμ. Α.1054"]:
+        assert not PAGE_BOILERPLATE.match(line), line
+
+def test_split_decisions_markers_and_titles():
+    pages = [
+        "ΠΕΡΙΕΧΟΜΕΝΑ\n(1)\nΑριθμ. Α.1\nΠρώτη απόφαση\nμε τίτλο σε δύο γραμμές.\nΚείμενο πρώτης.",
+        "(2)\nΑριθμ. Β.2\nΔεύτερη απόφαση\nΟ ΥΠΟΥΡΓΟΣ\nΚείμενο δεύτερης.",
+    ]
+    decisions = list(split_decisions(pages, max_chars=1000))
+    assert [decision['number'] for decision in decisions] == [1, 2]
+    # Consecutive markers open one decision; the title ends at a full stop or an all-caps heading
+    assert decisions[0]['title'] == "Πρώτη απόφαση με τίτλο σε δύο γραμμές."
+    assert decisions[1]['title'] == "Δεύτερη απόφαση"
+    # Front matter before the first marker belongs to no decision
+    assert all("ΠΕΡΙΕΧΟΜΕΝΑ" not in decision['text'] for decision in decisions)
+
+def test_split_decisions_truncates_text():
+    pages = ["(1)\nΤίτλος.\n" + "\n".join(["Μια αρκετά μεγάλη γραμμή κειμένου."] * 50)]
+    decision, = split_decisions(pages, max_chars=100)
+    assert len(decision['text']) <= 100
+
+def test_fixture_pages_and_decisions():
+    decisions = list(split_decisions(iter_pdf_pages(FIXTURE_PDF), max_chars=1000))
+    assert [decision['title'] for decision in decisions] == [
+        "Παράταση της προθεσμίας υποβολής των δηλώσεων ΦΠΑ.",
+        "Καθορισμός διαδικασίας επιστροφής φόρου εισοδήματος σε φυσικά πρόσωπα.",
+    ]
+    # The first decision continues on page 2, without the running header and page numbers in between
+    first_text = decisions[0]['text']
+    assert "Αποφασίζουμε την παράταση έως 30 Απριλίου." in first_text
+    for boilerplate in ["ΕΦΗΜΕΡΙΣ", "Τεύχος", "1234\n", "1235"]:
+        assert boilerplate not in first_text + "\n"
+    assert "Αποφασίζουμε" not in decisions[1]['text']
+
+def test_get_latest_gazette_items_from_local_pdf():
+    df = get_latest_gazette_items(issue_urls=[FIXTURE_PDF])
+    assert len(df) == 2
+    assert set(df['source']) == {'ΦΕΚ'}
+    assert set(df['date']) == {date(2024, 3, 15)}
+    assert list(df['url']) == [f"{FIXTURE_PDF}#decision-1", f"{FIXTURE_PDF}#decision-2"]
+    assert (df['id'] == df['url']).all()
+    assert all(len(description) <= 1000 for description in df['description'])
+    assert df['full_text'].str.contains("ΦΠΑ").any()
+
+def test_only_new_or_undownloaded_issues_are_parsed(tmp_path, monkeypatch):
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    settings.update(SCHEDULER_ENABLED=True, SCRAPER_ARCHIVE_MODE=None, GAZETTE_MAX_ISSUES=2,
+                    SCHEDULER_STATE_FILE_NAME=str(tmp_path / 'schedule.json'))
+    cfg = SimpleNamespace(**settings)
+    cache_dir = str(tmp_path / 'cache')
+    listed = ['/issue-1.pdf', '/issue-2.pdf']
+    monkeypatch.setattr(legislative_scraper, 'fetch_page_content', lambda url, headers, current_config, timeout:
+                        "".join(f'<a href="{href}">ΦΕΚ</a>' for href in listed))
+
+    def download(pdf_url, cache_dir, current_config):
+        pdf_path = cached_pdf_path(pdf_url, cache_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        shutil.copy(FIXTURE_PDF, pdf_path)
+        return pdf_path
+
+    monkeypatch.setattr(gazette_scraper, 'download_issue_pdf', download)
+
+    def parsed_issues():
+        df = get_latest_gazette_items(current_config=cfg, cache_dir=cache_dir, force=True)
+        return sorted({url.split('#')[0] for url in df['url']}) if not df.empty else []
+
+    base = config.GOV_GAZETTE_BASE_URL
+    assert parsed_issues() == [base + '/issue-1.pdf', base + '/issue-2.pdf']
+    assert parsed_issues() == [] # Both were ingested by the previous run
+    listed.insert(0, '/issue-3.pdf') # Newest first: issue-2 drops out of the GAZETTE_MAX_ISSUES latest
+    assert parsed_issues() == [base + '/issue-3.pdf']
+    os.remove(cached_pdf_path(base + '/issue-1.pdf', cache_dir)) # As if its download had failed
+    assert parsed_issues() == [base + '/issue-1.pdf']
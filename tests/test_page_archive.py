@@ -0,0 +1,73 @@
+# tests/test_page_archive.py
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+from data_ingestion import legislative_scraper
+from data_ingestion.page_archive import PageArchive
+
+PAGE = "<html><body><h1>Ανακοίνωση ΑΑΔΕ</h1></body></html>"
+
+def archive_config(tmp_path, mode, replay_at=None):
+    """A copy of config that archives under tmp_path (an absolute path is kept as is)."""
+    settings = {name: getattr(config, name) for name in dir(config) if name.isupper()}
+    settings.update(SCRAPER_ARCHIVE_MODE=mode, SCRAPER_ARCHIVE_DIR_NAME=str(tmp_path / 'archive'), SCRAPER_REPLAY_AT=replay_at)
+    return SimpleNamespace(**settings)
+
+class Response:
+    def __init__(self, url, status_code, text):
+        self.url, self.status_code, self.text = url, status_code, text
+        self.content = text.encode('utf-8')
+        self.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        self.encoding = self.apparent_encoding = 'utf-8'
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error")
+
+def test_record_lookup_and_get_text(tmp_path):
+    archive = PageArchive(str(tmp_path))
+    url = 'https://example.gr/news'
+    archive.record(url, 200, {}, "παλιά".encode('utf-8'), encoding='utf-8', timestamp='2024-01-01T10:00:00')
+    archive.record(url, 200, {}, "νέα".encode('cp1253'), encoding='cp1253', timestamp='2024-02-01T10:00:00')
+    archive.record(url, 503, {}, b"Service Unavailable", timestamp='2024-03-01T10:00:00')
+
+    assert archive.lookup(url)['status'] == 503
+    assert archive.get_text(url) is None # The latest capture is an error response
+    assert archive.lookup(url, at='2024-02-15T00:00:00')['timestamp'] == '2024-02-01T10:00:00'
+    assert archive.get_text(url, at='2024-02-15T00:00:00') == "νέα"
+    assert archive.get_text(url, at='2024-01-01T10:00:00') == "παλιά"
+    assert archive.lookup(url, at='2023-12-31T00:00:00') is None
+    assert archive.get_text('https://example.gr/other') is None
+
+    # The index is read back from disk by a new instance
+    reopened = PageArchive(str(tmp_path))
+    assert reopened.get_text(url, at='2024-02-15T00:00:00') == "νέα"
+    assert [header['status'] for header, _ in reopened.iter_captures(url)] == [200, 200, 503]
+
+def test_fetch_page_content_captures_then_replays_offline(tmp_path, monkeypatch):
+    url, broken_url = 'https://example.gr/news', 'https://example.gr/broken'
+    capture = archive_config(tmp_path, "capture")
+    responses = {url: Response(url, 200, PAGE), broken_url: Response(broken_url, 404, "Not Found")}
+    monkeypatch.setattr(legislative_scraper.requests, 'get', lambda url, headers, timeout: responses[url])
+    assert legislative_scraper.fetch_page_content(url, current_config=capture) == PAGE
+    assert legislative_scraper.fetch_page_content(broken_url, current_config=capture) is None
+
+    def no_network(*args, **kwargs):
+        pytest.fail("replay mode must not use the network")
+
+    monkeypatch.setattr(legislative_scraper.requests, 'get', no_network)
+    replay = archive_config(tmp_path, "replay")
+    assert legislative_scraper.fetch_page_content(url, current_config=replay) == PAGE
+    assert legislative_scraper.fetch_page_content(broken_url, current_config=replay) is None # Captured, but a 404
+    assert legislative_scraper.fetch_page_content('https://example.gr/missing', current_config=replay) is None
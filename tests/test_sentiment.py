@@ -0,0 +1,45 @@
+# tests/test_sentiment.py
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from nlp_processing.sentiment import LexiconSentimentScorer
+
+@pytest.fixture
+def scorer():
+    return LexiconSentimentScorer(lexicon={'βελτίωση': 0.7, 'πρόστιμο': -0.7}, negators=['δεν', 'χωρίς'])
+
+def compound(total, alpha=2.0):
+    return total / np.sqrt(total * total + alpha)
+
+def test_scores_are_normalised_sums_of_polarities(scorer):
+    scores = scorer.score_batch([['βελτίωση'], ['βελτίωση', 'βελτίωση', 'πρόστιμο'], ['άγνωστο'], []])
+    np.testing.assert_allclose(scores, [compound(0.7), compound(0.7), 0.0, 0.0])
+    assert np.all(np.abs(scorer.score_batch([['βελτίωση'] * 1000])) <= 1)
+
+def test_negator_flips_only_the_next_lemma(scorer):
+    scores = scorer.score_batch([['δεν', 'βελτίωση'], ['χωρίς', 'πρόστιμο'], ['δεν', 'άγνωστο', 'βελτίωση']])
+    np.testing.assert_allclose(scores, [compound(-0.7), compound(0.7), compound(0.7)])
+
+def test_negation_does_not_cross_document_boundaries(scorer):
+    # A negator at the end of a document must not flip the first lemma of the next one,
+    # also when empty documents lie in between
+    scores = scorer.score_batch([['βελτίωση', 'δεν'], ['βελτίωση'], ['δεν'], [], ['πρόστιμο']])
+    np.testing.assert_allclose(scores, [compound(0.7), compound(0.7), 0.0, 0.0, compound(-0.7)])
+
+def test_batch_scores_equal_one_by_one_scores():
+    scorer = LexiconSentimentScorer()
+    documents = [['δεν', 'βελτίωση', 'ανάπτυξη'], ['πρόστιμο', 'κύρωση'], ['μη', 'επιβάρυνση'], ['ρύθμιση']]
+    one_by_one = [scorer.score_batch([document])[0] for document in documents]
+    np.testing.assert_allclose(scorer.score_batch(documents), one_by_one)
+
+def test_empty_lexicon_scores_zero():
+    assert LexiconSentimentScorer(lexicon={}).score_batch([['βελτίωση'], []]).tolist() == [0.0, 0.0]
@@ -0,0 +1,73 @@
+# tests/test_similarity_index.py
+
+import copy
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from database.db_manager import DBManager
+from opportunity_identification.similarity_index import SimilarityIndex, rebuild_similarity_index
+
+VOCABULARY = [f'όρος{number}' for number in range(60)]
+
+def random_rows(rng, ids):
+    return [{'id': oid, 'keywords': ', '.join(rng.choice(VOCABULARY, size=rng.integers(2, 8), replace=False)),
+             'title_lemmas': ', '.join(rng.choice(VOCABULARY, size=2, replace=False))}
+            for oid in ids]
+
+def assert_lists_match_a_full_recompute(index):
+    expected = copy.deepcopy(index)
+    expected.recompute(freeze_idf=False)
+    # Equal similarities rank in either order, so the scores are compared list by list...
+    np.testing.assert_allclose(index.neighbour_sims, expected.neighbour_sims, atol=1e-5)
+    # ...and every kept neighbour must have the score the full computation gives it
+    vectors = index._weighted(index.counts)
+    for position in range(len(index.ids)):
+        for neighbour, similarity in zip(index.neighbours[position], index.neighbour_sims[position]):
+            if neighbour >= 0:
+                assert neighbour != position
+                assert abs(vectors[position].multiply(vectors[neighbour]).sum() - similarity) < 1e-5
+
+def test_incremental_updates_match_a_full_recompute(tmp_path):
+    rng = np.random.default_rng(7)
+    index = SimilarityIndex(str(tmp_path / 'index.npz'), n_features=2 ** 12, top_k=5, min_similarity=0.1)
+    index._add_rows(random_rows(rng, [f'u{number}' for number in range(200)]))
+    index.recompute()
+
+    new_ids = [f'u{number}' for number in range(200, 260)]
+    replaced_ids = [f'u{number}' for number in rng.choice(200, size=30, replace=False)]
+    for batch in (new_ids[:40], replaced_ids + new_ids[40:], replaced_ids[:5]):
+        changed = index.update(random_rows(rng, batch))
+        assert set(batch) <= set(changed)
+        assert_lists_match_a_full_recompute(index)
+
+def test_rebuild_reads_only_the_term_columns(tmp_path, monkeypatch):
+    db = DBManager(str(tmp_path / 'test.db'))
+    db.create_table()
+    db.insert_opportunities(pd.DataFrame([
+        {'id': f'u{number}', 'title': 'Παράταση προθεσμίας ΦΠΑ', 'url': f'u{number}', 'date': '2099-01-01',
+         'source': 'TestSource', 'keywords': 'παράταση, ΦΠΑ', 'full_text': 'Πλήρες κείμενο.',
+         'opportunity_score': 20.0, 'opportunity_type': 'Τύπος'}
+        for number in range(3)
+    ]))
+    iter_opportunity_chunks = db.iter_opportunity_chunks
+    read_columns = []
+
+    def recording_iter(*args, **kwargs):
+        for chunk in iter_opportunity_chunks(*args, **kwargs):
+            read_columns.append(set(chunk.columns))
+            yield chunk
+
+    monkeypatch.setattr(db, 'iter_opportunity_chunks', recording_iter)
+    assert rebuild_similarity_index(db, str(tmp_path / 'index.npz')) == 3
+    assert read_columns == [{'export_seq', 'id', 'keywords', 'title_lemmas', 'title'}]
+    _, related = db.get_opportunity_by_id('u0', include_related=True)
+    assert sorted(related['id']) == ['u1', 'u2']
+    db.close()
@@ -0,0 +1,87 @@
+# tests/test_source_scheduler.py
+
+import os
+import sys
+
+import pytest
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+from data_ingestion.source_scheduler import SourceScheduler
+
+NOW = 1_000_000.0
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return SourceScheduler(str(tmp_path / 'schedule.json'))
+
+def fail(scheduler, times, now=NOW):
+    for _ in range(times):
+        scheduler.record_poll('AADE', success=False, latency=None, now=now)
+
+def test_circuit_opens_at_the_failure_threshold(scheduler):
+    fail(scheduler, config.SCHEDULER_FAILURE_THRESHOLD - 1)
+    assert scheduler.is_due('AADE', now=NOW) # Failures below the threshold are retried on the next run
+    fail(scheduler, 1)
+    assert not scheduler.is_due('AADE', now=NOW)
+    assert not scheduler.is_due('AADE', now=NOW + config.SCHEDULER_BASE_BACKOFF - 1)
+    assert scheduler.is_due('AADE', now=NOW + config.SCHEDULER_BASE_BACKOFF) # The trial poll
+
+def test_backoff_doubles_up_to_the_maximum(scheduler):
+    fail(scheduler, config.SCHEDULER_FAILURE_THRESHOLD - 1)
+    backoffs = []
+    for _ in range(12):
+        fail(scheduler, 1)
+        backoffs.append(scheduler._sources['AADE']['circuit_open_until'] - NOW)
+    expected = [min(config.SCHEDULER_BASE_BACKOFF * 2 ** n, config.SCHEDULER_MAX_BACKOFF) for n in range(12)]
+    assert backoffs == expected
+    assert backoffs[-1] == config.SCHEDULER_MAX_BACKOFF
+
+def test_success_closes_the_circuit(scheduler):
+    fail(scheduler, config.SCHEDULER_FAILURE_THRESHOLD + 2)
+    trial = NOW + config.SCHEDULER_MAX_BACKOFF
+    scheduler.record_poll('AADE', success=True, latency=1.0, item_ids=['a'], now=trial)
+    source = scheduler._sources['AADE']
+    assert source['consecutive_failures'] == 0 and source['circuit_open_until'] == 0.0
+    assert scheduler.is_due('AADE', now=trial + scheduler.poll_interval('AADE'))
+    # The failure count starts over: one failure does not reopen the circuit
+    fail(scheduler, 1, now=trial)
+    assert scheduler.is_due('AADE', now=trial)
+
+def test_new_items_are_told_from_seen_ones(scheduler):
+    assert scheduler.record_poll('AADE', True, 1.0, item_ids=['a', 'b', 'a'], now=NOW) == 2
+    assert scheduler.record_poll('AADE', True, 1.0, item_ids=['b', 'c'], now=NOW) == 1
+    assert scheduler.record_poll('AADE', True, 1.0, item_ids=['a', 'b', 'c'], now=NOW) == 0
+
+def test_interval_grows_for_quiet_sources_and_shrinks_for_active_ones(scheduler):
+    assert scheduler.poll_interval('AADE') == config.SCHEDULER_MIN_INTERVAL # New sources start optimistic
+    intervals = []
+    for _ in range(5):
+        scheduler.record_poll('AADE', True, 1.0, item_ids=['same'], now=NOW)
+        intervals.append(scheduler.poll_interval('AADE'))
+    assert intervals == sorted(intervals) and intervals[-1] > intervals[0]
+    assert intervals[-1] <= config.SCHEDULER_MAX_INTERVAL
+    assert not scheduler.is_due('AADE', now=NOW + intervals[-1] - 1)
+    assert scheduler.is_due('AADE', now=NOW + intervals[-1])
+    for number in range(5):
+        scheduler.record_poll('AADE', True, 1.0, item_ids=[f'new-{number}'], now=NOW)
+    assert scheduler.poll_interval('AADE') < intervals[-1]
+
+@pytest.mark.parametrize('latency', [0.01, 1.0, 2.0, 100.0])
+def test_timeout_stays_within_its_bounds(scheduler, latency):
+    assert scheduler.timeout_for('AADE') == config.SCHEDULER_MAX_TIMEOUT # No latency observed yet
+    scheduler.record_poll('AADE', True, latency, now=NOW)
+    expected = min(max(latency * config.SCHEDULER_TIMEOUT_FACTOR, config.SCHEDULER_MIN_TIMEOUT), config.SCHEDULER_MAX_TIMEOUT)
+    assert scheduler.timeout_for('AADE') == expected
+    assert config.SCHEDULER_MIN_TIMEOUT <= scheduler.timeout_for('AADE') <= config.SCHEDULER_MAX_TIMEOUT
+
+def test_state_carries_over_between_instances(scheduler):
+    fail(scheduler, config.SCHEDULER_FAILURE_THRESHOLD)
+    scheduler.save()
+    reloaded = SourceScheduler(scheduler.state_path)
+    assert not reloaded.is_due('AADE', now=NOW)
+    assert reloaded._sources == scheduler._sources
@@ -0,0 +1,41 @@
+# tests/test_startup_benchmark.py
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+from utils.startup_benchmark import dashboard_imports, measure_imports, parse_importtime, IMPORTS_MARKER
+
+HEAVY_MODULES = ['spacy', 'bs4', 'requests', 'pypdf', 'scipy']
+
+def test_dashboard_imports_leave_out_the_heavy_stacks():
+    code = "\n".join(dashboard_imports() + [f"print(sorted(set({HEAVY_MODULES!r}) & set(sys.modules)))"])
+    completed = subprocess.run([sys.executable, '-c', code], cwd=project_root, capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip().splitlines()[-1] == '[]'
+
+def test_parse_importtime_keeps_top_level_modules_after_the_marker():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | encodings",
+        IMPORTS_MARKER,
+        "import time:       200 |        200 |   pandas._libs",
+        "import time:       300 |        500 | pandas",
+        "import time:        50 |         50 | config",
+    ])
+    total, modules = parse_importtime(stderr)
+    assert modules == {'pandas': 0.0005, 'config': 0.00005}
+    assert total == pytest.approx(0.00055)
+
+def test_dashboard_imports_within_target():
+    total, _, modules = measure_imports(dashboard_imports())
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+    assert total <= config.STARTUP_IMPORT_TARGET, f"{total:.2f}s over {config.STARTUP_IMPORT_TARGET}s: {slowest}"
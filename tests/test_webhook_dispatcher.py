@@ -0,0 +1,69 @@
+# tests/test_webhook_dispatcher.py
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+import requests
+
+# Add the project root to the PATH to locate the project modules
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from data_export import webhook_dispatcher
+from database.db_manager import DBManager
+
+class Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Client Error")
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DBManager(str(tmp_path / 'test.db'))
+    manager.create_table()
+    manager.insert_opportunities(pd.DataFrame([
+        {'id': f'u{number}', 'title': f'Είδηση {number}', 'url': f'u{number}', 'date': '2099-01-01', 'source': 'TestSource',
+         'keywords': 'φόρος', 'opportunity_score': 20.0, 'opportunity_type': 'Τύπος'}
+        for number in range(3)
+    ]))
+    yield manager
+    manager.close()
+
+def make_dispatcher(db, tmp_path, monkeypatch, replies):
+    posted = []
+
+    def post(url, data, timeout, headers):
+        posted.append(json.loads(data))
+        return Response(replies.pop(0))
+
+    monkeypatch.setattr(webhook_dispatcher.requests, 'post', post)
+    monkeypatch.setattr(webhook_dispatcher.time, 'sleep', lambda seconds: None)
+    dispatcher = webhook_dispatcher.WebhookDispatcher(
+        db, url='http://localhost/hook', min_score=0, batch_size=2, max_retries=1,
+        state_path=str(tmp_path / 'cursor.json'), dead_letter_path=str(tmp_path / 'dead.jsonl'),
+    )
+    return dispatcher, posted
+
+def test_rejected_batch_is_dead_lettered_and_skipped(db, tmp_path, monkeypatch):
+    dispatcher, posted = make_dispatcher(db, tmp_path, monkeypatch, [400, 200])
+    assert dispatcher.dispatch() == 1
+    assert [len(payload['changes']) for payload in posted] == [2, 1]
+    assert dispatcher.load_cursor() == 3
+    with open(dispatcher.dead_letter_path, 'r', encoding='utf-8') as f:
+        dead, = [json.loads(line) for line in f]
+    assert [change['id'] for change in dead['changes']] == ['u0', 'u1']
+    assert dead['reason'].startswith('400')
+
+def test_failed_batch_keeps_the_cursor(db, tmp_path, monkeypatch):
+    dispatcher, posted = make_dispatcher(db, tmp_path, monkeypatch, [503, 503])
+    assert dispatcher.dispatch() == 0
+    assert len(posted) == 2 # One retry
+    assert dispatcher.load_cursor() == 0
+    assert not os.path.exists(dispatcher.dead_letter_path)
@@ -0,0 +1,127 @@
+# utils/startup_benchmark.py
+
+import os
+import sys
+import ast
+import time
+import statistics
+import subprocess
+
+# Add the project root to the PATH to locate the config module
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import config
+
+DEFAULT_APP_PATH = os.path.join(project_root, 'frontend', 'app.py')
+IMPORTS_MARKER = "startup-benchmark: app imports"
+
+def dashboard_imports(app_path=DEFAULT_APP_PATH):
+    """
+    Returns the import statements app.py runs at start-up (module level, including the
+    ones in top-level try blocks), as source lines. Imports inside functions are lazy and left out,
+    so a heavy import moved back to the top of the app shows up in the benchmark.
+    """
+    with open(app_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=app_path)
+    statements = []
+    for node in tree.body:
+        for child in (node.body if isinstance(node, ast.Try) else [node]):
+            if isinstance(child, (ast.Import, ast.ImportFrom)):
+                statements.append(ast.unparse(child))
+    return statements
+
+def parse_importtime(stderr):
+    """
+    Parses the -X importtime report into (total seconds, {top-level module: cumulative seconds}).
+    Only the modules imported directly by the measured code (after IMPORTS_MARKER, so not the
+    interpreter's own start-up) are kept; their cumulative times include everything they import in turn.
+    """
+    modules = {}
+    lines = stderr.splitlines()
+    if IMPORTS_MARKER in lines:
+        lines = lines[lines.index(IMPORTS_MARKER) + 1:]
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name_field = line[len('import time:'):].split('|')
+        if len(name_field) - len(name_field.lstrip()) == 1: # Nested imports are indented further
+            modules[name_field.strip()] = int(cumulative) / 1e6
+    return sum(modules.values()), modules
+
+def _run(code, importtime=False):
+    """Runs code in a fresh interpreter from the project root. Returns (wall seconds, completed process)."""
+    options = ['-X', 'importtime'] if importtime else []
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, *options, '-c', code], cwd=project_root,
+                               capture_output=True, text=True)
+    return time.perf_counter() - start, completed
+
+def measure_imports(statements, runs=3):
+    """
+    Times the given import statements in fresh interpreters.
+    Returns the median import time, the median wall time (interpreter start included)
+    and the per-module times of the median run.
+    """
+    results = []
+    for _ in range(runs):
+        code = "\n".join([f"import sys; print({IMPORTS_MARKER!r}, file=sys.stderr, flush=True)", *statements])
+        wall, completed = _run(code, importtime=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"The start-up imports failed: {completed.stderr.strip().splitlines()[-1]}")
+        total, modules = parse_importtime(completed.stderr)
+        results.append((total, wall, modules))
+    results.sort(key=lambda result: result[0])
+    total, _, modules = results[len(results) // 2]
+    return total, statistics.median(result[1] for result in results), modules
+
+def measure_first_render(app_path=DEFAULT_APP_PATH, runs=3, timeout=60):
+    """
+    Median seconds from interpreter start until the first run of the app script has rendered,
+    using Streamlit's AppTest in a fresh interpreter (no browser or server involved).
+    An empty GEMINI_API_KEY secret is set, so the run does not depend on a local secrets.toml.
+    """
+    code = (
+        "from streamlit.testing.v1 import AppTest\n"
+        f"app = AppTest.from_file({app_path!r}, default_timeout={timeout})\n"
+        "app.secrets['GEMINI_API_KEY'] = ''\n"
+        "app.run()\n"
+        "raise SystemExit(1 if app.exception else 0)\n"
+    )
+    walls = []
+    for _ in range(runs):
+        wall, completed = _run(code)
+        if completed.returncode != 0:
+            output = (completed.stderr or completed.stdout).strip().splitlines()
+            raise RuntimeError(f"The first render failed: {output[-1] if output else completed.returncode}")
+        walls.append(wall)
+    return statistics.median(walls)
+
+def run_benchmark(app_path=DEFAULT_APP_PATH, runs=3, top_n=10, render=True):
+    """
+    Prints the start-up import times of the dashboard (and, with render, its time to first render)
+    against STARTUP_IMPORT_TARGET / STARTUP_FIRST_RENDER_TARGET. Returns True if both are met.
+    """
+    statements = dashboard_imports(app_path)
+    import_total, import_wall, modules = measure_imports(statements, runs=runs)
+    print(f"Start-up imports: {import_total:.2f}s (process {import_wall:.2f}s), target {config.STARTUP_IMPORT_TARGET:.2f}s")
+    for name, seconds in sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top_n]:
+        print(f"  {seconds:7.3f}s  {name}")
+    within_targets = import_total <= config.STARTUP_IMPORT_TARGET
+
+    if render:
+        try:
+            first_render = measure_first_render(app_path, runs=runs)
+        except RuntimeError as e:
+            print(e)
+            return False
+        print(f"Time to first render: {first_render:.2f}s, target {config.STARTUP_FIRST_RENDER_TARGET:.2f}s")
+        within_targets &= first_render <= config.STARTUP_FIRST_RENDER_TARGET
+
+    print("Start-up is within its targets." if within_targets else "Start-up is OVER its targets.")
+    return within_targets
+
+if __name__ == "__main__":
+    # python utils/startup_benchmark.py [--imports-only]; exits with 1 when a target is missed
+    sys.exit(0 if run_benchmark(render='--imports-only' not in sys.argv) else 1)